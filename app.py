@@ -4,12 +4,16 @@ eLandings Sync - Streamlit Demo
 A prototype demonstrating automated landing report sync from eLandings.
 """
 
-import json
+import mmap
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
+from typing import Any
 
+import orjson
 import pandas as pd
 import streamlit as st
 
@@ -18,6 +22,13 @@ sys.path.insert(0, str(Path(__file__).parent / "src" / "client"))
 
 from elandings_client import ELandingsClient, pretty_print_xml
 from sync_landing_reports import LandingReportSync, parse_landing_report
+from report_index import (
+    INDEX_FILENAME,
+    build_index_frame,
+    decode_index_report,
+    load_index_sidecar,
+    save_index_sidecar,
+)
 
 # Try to import Supabase storage (optional dependency)
 try:
@@ -122,50 +133,70 @@ def get_cached_supabase_storage():
     return get_supabase_storage()
 
 
+@st.cache_resource
+def get_cached_elandings_client(user: str, password: str, schema_version: str) -> ELandingsClient:
+    """Get cached eLandings client, so its HTTP connections survive reruns."""
+    return ELandingsClient(user=user, password=password, schema_version=schema_version)
+
+
 def extract_value(obj, default=""):
     """Extract text value from dict or return string directly."""
+    # Plain strings are the common case, so check for them first
+    if type(obj) is str:
+        return obj or default
     if isinstance(obj, dict):
-        return obj.get("#text", obj.get("@name", str(obj)))
+        if "#text" in obj:
+            return obj["#text"]
+        return obj["@name"] if "@name" in obj else str(obj)
     return str(obj) if obj else default
 
 
-def landing_report_to_row(report: dict) -> dict:
-    """Convert a landing report JSON to a flat row for display."""
-    header = report.get("header", {})
-    line_items = report.get("line_item", [])
-    if isinstance(line_items, dict):
-        line_items = [line_items]
+def _attr(d, key, default=""):
+    """Get an attribute such as @name from an element known to be a dict."""
+    return d.get(key, default) if d else default
 
-    # Sum up weights from all line items
-    total_weight = 0
-    species_list = []
-    for item in line_items:
-        try:
-            weight = float(item.get("weight", 0))
-            total_weight += weight
-        except (ValueError, TypeError):
-            pass
-        species = item.get("species", {})
-        species_name = species.get("@name", "") if isinstance(species, dict) else ""
-        if species_name and species_name not in species_list:
-            species_list.append(species_name)
-
-    # Get vessel number (the #text value) - this is the ADF&G vessel number
-    vessel_obj = header.get("vessel", {})
-    vessel_num = vessel_obj.get("#text", "") if isinstance(vessel_obj, dict) else ""
 
-    return {
-        "Report ID": extract_value(report.get("landing_report_id")),
-        "Status": extract_value(report.get("status", {}).get("@desc", "")),
-        "Type": extract_value(report.get("type_of_landing_report", {}).get("@name", "")),
-        "Vessel": extract_value(header.get("vessel", {}).get("@name", "")),
-        "ADF&G Vessel #": vessel_num,
-        "Port": extract_value(header.get("port_of_landing", {}).get("@name", "")),
-        "Landing Date": extract_value(header.get("date_of_landing", "")),
-        "Species": ", ".join(species_list),
-        "Total Weight (lbs)": f"{total_weight:,.0f}",
-        "Last Modified": report.get("@last_change_date", "")[:10],
-    }
+# Files larger than this are memory-mapped instead of read into a buffer
+MMAP_THRESHOLD_BYTES = 256 * 1024
+
+# Threads used to read and parse report files concurrently
+PARSE_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def load_report_file(path, decode=orjson.loads) -> Any:
+    """Read and parse a landing report JSON file.
+
+    ``decode`` receives the raw bytes; it defaults to a full ``orjson`` parse.
+    """
+    with open(path, "rb") as fp:
+        if os.fstat(fp.fileno()).st_size <= MMAP_THRESHOLD_BYTES:
+            return decode(fp.read())
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return decode(view)
+
+
+def try_load_report_file(path, decode=orjson.loads) -> Any:
+    """Load a report file, returning None if it can't be read or parsed."""
+    try:
+        return load_report_file(path, decode)
+    except Exception:
+        return None
+
+
+def load_report_files(paths: list[str], decode=orjson.loads) -> list[Any]:
+    """Load report files in parallel, preserving order (None for failures)."""
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=PARSE_WORKERS) as executor:
+        return list(executor.map(partial(try_load_report_file, decode=decode), paths))
+
+
+# Columns of the full report table, in display order
+REPORT_COLUMNS = [
+    "Report ID", "Status", "Type", "Vessel", "ADF&G Vessel #", "Port",
+    "Landing Date", "Species", "Total Weight (lbs)", "Last Modified",
+]
 
 
 # Sidebar for configuration
@@ -201,61 +232,109 @@ with st.sidebar:
         st.session_state["authenticated"] = False
         st.rerun()
 
-# Main content
-tab1, tab2, tab3, tab4 = st.tabs(["Landing Reports", "Sync Data", "Report Details", "Data Dictionary"])
+# Main content - only the selected tab's body runs on each rerun, so e.g.
+# the report index isn't built while the user is on the Sync tab
+active_tab = st.radio(
+    "View",
+    ["Landing Reports", "Sync Data", "Report Details", "Data Dictionary"],
+    horizontal=True,
+    key="active_tab",
+    label_visibility="collapsed",
+)
 
-@st.cache_data
-def build_report_index_from_files(data_dir: str) -> pd.DataFrame:
-    """Build a lightweight index of all reports from local files."""
-    data_path = Path(data_dir)
-    index_data = []
+def scan_report_files(data_dir: str) -> list[os.DirEntry]:
+    """List landing_report_*.json files in data_dir with a single scandir pass."""
+    try:
+        with os.scandir(data_dir) as entries:
+            return [
+                e for e in entries
+                if e.name.startswith("landing_report_")
+                and e.name.endswith(".json")
+                and e.is_file(follow_symlinks=False)
+            ]
+    except FileNotFoundError:
+        return []
 
-    for f in data_path.glob("landing_report_*.json"):
-        try:
-            with open(f, encoding="utf-8", errors="replace") as fp:
-                report = json.load(fp)
-                header = report.get("header", {})
 
-                # Extract vessel number - this is the ADF&G vessel number
-                vessel_obj = header.get("vessel", {})
-                vessel_num = vessel_obj.get("#text", "") if isinstance(vessel_obj, dict) else ""
+def report_dir_mtime(data_dir: str) -> int:
+    """Modification time of the reports directory, used to bust listing caches.
 
-                # Extract species list
-                line_items = report.get("line_item", [])
-                if isinstance(line_items, dict):
-                    line_items = [line_items]
-                species_list = []
-                for item in line_items:
-                    species = item.get("species", {})
-                    species_name = species.get("@name", "") if isinstance(species, dict) else ""
-                    if species_name and species_name not in species_list:
-                        species_list.append(species_name)
-
-                index_data.append({
-                    "file": str(f),
-                    "Report ID": extract_value(report.get("landing_report_id")),
-                    "Vessel": extract_value(header.get("vessel", {}).get("@name", "")),
-                    "ADF&G Vessel #": vessel_num,
-                    "Species": ", ".join(species_list),
-                    "Landing Date": extract_value(header.get("date_of_landing", "")),
-                    "Last Modified": report.get("@last_change_date", "")[:10] if report.get("@last_change_date") else "",
-                })
-        except Exception:
-            pass
+    It changes whenever a report file is added, removed or replaced, and on
+    every sync, which rewrites the index sidecar in the same directory.
+    """
+    try:
+        return os.stat(data_dir).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def finalize_index(df: pd.DataFrame) -> tuple[pd.DataFrame, list[str]]:
+    """Sort an index, add filter helper columns and collect vessel options."""
+    if df.empty:
+        return df, []
+    # Sort by landing date descending (most recent first), comparing parsed
+    # dates rather than strings like "2017-01-02-09:00"
+    df = df.sort_values(
+        "Landing Date",
+        ascending=False,
+        key=lambda dates: pd.to_datetime(dates.str[:10], errors="coerce"),
+    )
+    # Low-cardinality columns as categoricals, free text as Arrow strings
+    df = df.astype({col: "category" for col in ("Vessel", "Port", "Type", "Status") if col in df.columns})
+    df["Species"] = df["Species"].astype("string[pyarrow]")
+    # Pre-lowercased species so the filter is a plain substring search
+    df["_species_lc"] = df["Species"].str.lower()
+    return df, sorted(df["Vessel"].dropna().unique())
 
-    df = pd.DataFrame(index_data)
-    # Sort by landing date descending (most recent first)
-    if not df.empty and "Landing Date" in df.columns:
-        df = df.sort_values("Landing Date", ascending=False)
-    return df
+
+@st.cache_data
+def build_report_index_from_files(data_dir: str, dir_mtime_ns: int) -> tuple[pd.DataFrame, list[str]]:
+    """Build a lightweight index of all reports from local files.
+
+    Rows are reused from the parquet sidecar when the file's mtime is unchanged,
+    so only new or modified reports are parsed. ``dir_mtime_ns`` is only used
+    as part of the Streamlit cache key.
+    """
+    index_path = Path(data_dir) / INDEX_FILENAME
+    entries = scan_report_files(data_dir)
+    paths = {e.name: e.path for e in entries}
+    mtimes = {e.name: e.stat().st_mtime_ns for e in entries}
+
+    # Keep sidecar rows whose file still exists with the same mtime
+    cached = load_index_sidecar(index_path)
+    cached_rows = len(cached)
+    if not cached.empty:
+        fresh = [mtimes.get(f) == m for f, m in zip(cached["file"], cached["mtime"])]
+        cached = cached[fresh]
+    known_files = set(cached["file"]) if not cached.empty else set()
+
+    new_files = [f for f in mtimes if f not in known_files]
+    new_paths = [paths[f] for f in new_files]
+    files, file_mtimes, reports = [], [], []
+    for f, report in zip(new_files, load_report_files(new_paths, decode_index_report)):
+        if report is not None:
+            files.append(f)
+            file_mtimes.append(mtimes[f])
+            reports.append(report)
+
+    new_rows = build_index_frame(files, file_mtimes, reports)
+    frames = [frame for frame in (cached, new_rows) if not frame.empty]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if reports or len(cached) != cached_rows:
+        save_index_sidecar(df, index_path)
+
+    # The sidecar stores names relative to data_dir; callers load by full path
+    if not df.empty:
+        df["file"] = df["file"].map(paths)
+    return finalize_index(df)
 
 
 @st.cache_data(ttl=60)
-def build_report_index_from_supabase(_supabase) -> pd.DataFrame:
+def build_report_index_from_supabase(_supabase) -> tuple[pd.DataFrame, list[str]]:
     """Build report index from Supabase."""
     reports = _supabase.get_all_reports()
     if not reports:
-        return pd.DataFrame()
+        return pd.DataFrame(), []
 
     # Need to get species from line items for each report
     index_data = []
@@ -284,40 +363,48 @@ def build_report_index_from_supabase(_supabase) -> pd.DataFrame:
             "Status": r.get("status_desc", ""),
         })
 
-    df = pd.DataFrame(index_data)
-    if not df.empty and "Landing Date" in df.columns:
-        df = df.sort_values("Landing Date", ascending=False)
-    return df
+    return finalize_index(pd.DataFrame(index_data))
 
 
-def build_report_index(data_dir: str, supabase=None) -> pd.DataFrame:
-    """Build report index from Supabase if available, else from files."""
+def build_report_index(data_dir: str, supabase=None) -> tuple[pd.DataFrame, list[str]]:
+    """Build report index from Supabase if available, else from files.
+
+    Returns the index and the sorted vessel names used as filter options.
+    """
     if supabase:
         return build_report_index_from_supabase(supabase)
-    return build_report_index_from_files(data_dir)
+    return build_report_index_from_files(data_dir, report_dir_mtime(data_dir))
 
 
-def load_full_reports(file_paths: list[str]) -> pd.DataFrame:
-    """Load full report data for display."""
-    reports = []
-    for f in file_paths:
-        try:
-            with open(f, encoding="utf-8", errors="replace") as fp:
-                report = json.load(fp)
-                reports.append(landing_report_to_row(report))
-        except Exception:
-            pass
-    return pd.DataFrame(reports)
+@st.cache_data
+def list_report_ids(data_dir: str, dir_mtime_ns: int) -> list[str]:
+    """List local report IDs, newest first.
+
+    ``dir_mtime_ns`` is only used as part of the Streamlit cache key.
+    """
+    return sorted(
+        (e.name.removeprefix("landing_report_").removesuffix(".json") for e in scan_report_files(data_dir)),
+        reverse=True,
+    )
+
+
+@st.cache_data(ttl=60)
+def list_supabase_report_ids(_supabase) -> list[str]:
+    """List report IDs stored in Supabase, newest first."""
+    return sorted(_supabase.get_existing_report_ids(), reverse=True)
 
 
-with tab1:
+# Reports shown per page in the Landing Reports tab
+REPORTS_PAGE_SIZE = 50
+
+if active_tab == "Landing Reports":
     st.header("Landing Reports")
 
     data_dir = Path("data/landing_reports")
 
     # Build index from Supabase or local files
     with st.spinner("Loading reports..."):
-        index_df = build_report_index(str(data_dir), supabase)
+        index_df, all_vessels = build_report_index(str(data_dir), supabase)
 
     if not index_df.empty:
         storage_type = "Supabase" if supabase else "local storage"
@@ -326,7 +413,6 @@ with tab1:
         # Filters - use index for filter options (all reports)
         col1, col2 = st.columns(2)
         with col1:
-            all_vessels = sorted(index_df["Vessel"].dropna().unique())
             vessel_filter = st.multiselect(
                 "Filter by Vessel",
                 options=all_vessels,
@@ -334,37 +420,39 @@ with tab1:
         with col2:
             species_filter = st.text_input("Filter by Species (contains)")
 
-        # Apply filters to index
-        filtered_index = index_df.copy()
+        # Apply filters to index as one boolean mask; no copy when unfiltered
+        mask = pd.Series(True, index=index_df.index)
         if vessel_filter:
-            filtered_index = filtered_index[filtered_index["Vessel"].isin(vessel_filter)]
+            mask &= index_df["Vessel"].isin(vessel_filter)
         if species_filter:
-            filtered_index = filtered_index[
-                filtered_index["Species"].str.contains(species_filter, case=False, na=False)
-            ]
-
-        # Determine display limit
-        has_filter = bool(vessel_filter or species_filter)
-        if has_filter:
-            display_df = filtered_index
-            showing_msg = f"Showing all **{len(display_df)}** matching reports"
+            mask &= index_df["_species_lc"].str.contains(species_filter.lower(), regex=False, na=False)
+        filtered_index = index_df[mask] if (vessel_filter or species_filter) else index_df
+
+        # Paginate so only the visible page of reports is loaded and parsed
+        page_size = REPORTS_PAGE_SIZE
+        total = len(filtered_index)
+        page_count = max(1, -(-total // page_size))
+        page = 1
+        if page_count > 1:
+            page = st.number_input("Page", min_value=1, max_value=page_count, value=1)
+        start = (page - 1) * page_size
+        display_df = filtered_index.iloc[start:start + page_size]
+
+        if page_count > 1:
+            showing_msg = f"Showing reports **{start + 1}-{start + len(display_df)}** of **{total}** (page {page} of {page_count})"
+        elif vessel_filter or species_filter:
+            showing_msg = f"Showing all **{total}** matching reports"
         else:
-            display_df = filtered_index.head(100)
-            if len(filtered_index) > 100:
-                showing_msg = f"Showing **100** most recent reports (use filters to see all **{len(filtered_index)}**)"
-            else:
-                showing_msg = f"Showing all **{len(display_df)}** reports"
+            showing_msg = f"Showing all **{total}** reports"
 
         st.caption(showing_msg)
 
         if not display_df.empty:
-            if supabase:
-                # For Supabase, index already has all display columns
-                df = display_df[["Report ID", "Status", "Type", "Vessel", "ADF&G Vessel #", "Port", "Landing Date", "Species", "Last Modified"]].copy()
-            else:
-                # For local files, load full reports
-                files_to_load = display_df["file"].tolist()
-                df = load_full_reports(files_to_load)
+            # The index holds every display column, so no report files are read
+            # here; Supabase indexes have no total weight
+            df = display_df[[col for col in REPORT_COLUMNS if col in display_df.columns]].copy()
+            if "Total Weight (lbs)" in df.columns:
+                df["Total Weight (lbs)"] = df["Total Weight (lbs)"].map("{:,.0f}".format)
 
             st.dataframe(
                 df,
@@ -375,16 +463,16 @@ with tab1:
             # Summary stats
             st.subheader("Summary")
             col1, col2, col3, col4 = st.columns(4)
-            col1.metric("Total Reports", len(df))
-            col2.metric("Unique Vessels", df["Vessel"].nunique())
-            col3.metric("Unique Ports", df["Port"].nunique() if "Port" in df.columns else "N/A")
-            col4.metric("Report Types", df["Type"].nunique() if "Type" in df.columns else "N/A")
+            col1.metric("Total Reports", total)
+            col2.metric("Unique Vessels", filtered_index["Vessel"].nunique())
+            col3.metric("Unique Ports", filtered_index["Port"].nunique())
+            col4.metric("Report Types", filtered_index["Type"].nunique())
         else:
             st.warning("No reports match your filters.")
     else:
         st.warning("No landing reports found. Use the **Sync Data** tab to pull reports.")
 
-with tab2:
+if active_tab == "Sync Data":
     st.header("Sync Landing Reports")
 
     if demo_mode:
@@ -415,6 +503,9 @@ with tab2:
                 sync = LandingReportSync(
                     output_dir="data/landing_reports",
                     supabase_storage=supabase,
+                    client=get_cached_elandings_client(
+                        creds["user"], creds["password"], creds["schema_version"]
+                    ),
                 )
 
                 if full_refresh:
@@ -432,7 +523,7 @@ with tab2:
                     if action == "skipped":
                         status_text.text(f"[{current}/{total}] Skipped {report_id} (already exists)")
                     else:
-                        status_text.text(f"[{current}/{total}] Fetching {report_id}...")
+                        status_text.text(f"[{current}/{total}] Fetched {report_id}")
 
                 status_text.text("Searching for reports...")
                 result = sync.sync(
@@ -464,7 +555,34 @@ with tab2:
             except Exception as e:
                 st.error(f"Sync failed: {e}")
 
-with tab3:
+@st.cache_data(show_spinner=False)
+def load_report(path: str, mtime_ns: int) -> dict:
+    """Load one report file; ``mtime_ns`` keys the cache to the file version."""
+    return load_report_file(path)
+
+
+# Flattened line item paths shown in the Report Details table, with their labels
+LINE_ITEM_COLUMNS = {
+    "item_number": "Item #",
+    "fish_ticket_number": "Fish Ticket",
+    "species.@name": "Species",
+    "condition_code.@name": "Condition",
+    "weight": "Weight",
+    "disposition_code.@name": "Disposition",
+}
+
+
+@st.cache_data(show_spinner=False)
+def line_items_frame(report_id: str, report_version, _line_items: list[dict]) -> pd.DataFrame:
+    """Line item table for the Report Details view.
+
+    Cached by report ID and version; the line items themselves are not hashed.
+    """
+    items = pd.json_normalize(_line_items, max_level=1)
+    return items.reindex(columns=list(LINE_ITEM_COLUMNS)).fillna("").rename(columns=LINE_ITEM_COLUMNS)
+
+
+if active_tab == "Report Details":
     st.header("Report Details")
 
     data_dir = Path("data/landing_reports")
@@ -472,14 +590,9 @@ with tab3:
     # Get report IDs from Supabase or local files
     report_ids = []
     if supabase:
-        existing_ids = supabase.get_existing_report_ids()
-        report_ids = sorted(existing_ids, reverse=True)
+        report_ids = list_supabase_report_ids(supabase)
     elif data_dir.exists():
-        json_files = list(data_dir.glob("landing_report_*.json"))
-        for f in json_files:
-            report_id = f.stem.replace("landing_report_", "")
-            report_ids.append(report_id)
-        report_ids = sorted(report_ids, reverse=True)
+        report_ids = list_report_ids(str(data_dir), report_dir_mtime(str(data_dir)))
 
     if report_ids:
         # Combobox: type to filter/enter or select from dropdown
@@ -493,13 +606,16 @@ with tab3:
         if selected_id:
             # Load report from Supabase or local file
             report = None
+            report_version = None  # Changes whenever the stored report does
             if supabase:
                 report = supabase.get_report(int(selected_id))
+                if report:
+                    report_version = report.get("@last_change_date", "")
             else:
                 report_file = data_dir / f"landing_report_{selected_id}.json"
                 if report_file.exists():
-                    with open(report_file, encoding="utf-8", errors="replace") as f:
-                        report = json.load(f)
+                    report_version = report_file.stat().st_mtime_ns
+                    report = load_report(str(report_file), report_version)
 
             if report:
                 # Display key info
@@ -510,13 +626,15 @@ with tab3:
                 with col1:
                     st.markdown("### Header")
                     vessel_obj = header.get('vessel', {})
-                    vessel_name = extract_value(vessel_obj.get('@name')) if isinstance(vessel_obj, dict) else ""
-                    vessel_num = vessel_obj.get('#text', '') if isinstance(vessel_obj, dict) else ""
+                    if not isinstance(vessel_obj, dict):
+                        vessel_obj = {}
+                    vessel_name = _attr(vessel_obj, '@name')
+                    vessel_num = vessel_obj.get('#text', '')
                     st.write(f"**Vessel:** {vessel_name}")
                     st.write(f"**ADF&G Vessel #:** {vessel_num}")
-                    st.write(f"**Port:** {extract_value(header.get('port_of_landing', {}).get('@name'))}")
+                    st.write(f"**Port:** {_attr(header.get('port_of_landing'), '@name')}")
                     st.write(f"**Landing Date:** {extract_value(header.get('date_of_landing'))}")
-                    st.write(f"**Gear:** {extract_value(header.get('gear', {}).get('@name'))}")
+                    st.write(f"**Gear:** {_attr(header.get('gear'), '@name')}")
 
                 with col2:
                     st.markdown("### Processor")
@@ -527,8 +645,8 @@ with tab3:
 
                 with col3:
                     st.markdown("### Status")
-                    st.write(f"**Status:** {extract_value(report.get('status', {}).get('@desc'))}")
-                    st.write(f"**Type:** {extract_value(report.get('type_of_landing_report', {}).get('@name'))}")
+                    st.write(f"**Status:** {_attr(report.get('status'), '@desc')}")
+                    st.write(f"**Type:** {_attr(report.get('type_of_landing_report'), '@name')}")
                     st.write(f"**Last Modified:** {report.get('@last_change_date', '')[:19]}")
 
                 # Line items
@@ -538,28 +656,98 @@ with tab3:
                     line_items = [line_items]
 
                 if line_items:
-                    items_df = pd.DataFrame([
-                        {
-                            "Item #": item.get("item_number", ""),
-                            "Fish Ticket": extract_value(item.get("fish_ticket_number")),
-                            "Species": extract_value(item.get("species", {}).get("@name")),
-                            "Condition": extract_value(item.get("condition_code", {}).get("@name")),
-                            "Weight": extract_value(item.get("weight")),
-                            "Disposition": extract_value(item.get("disposition_code", {}).get("@name")),
-                        }
-                        for item in line_items
-                    ])
+                    items_df = line_items_frame(selected_id, report_version, line_items)
                     st.dataframe(items_df, use_container_width=True, hide_index=True)
 
-                # Raw JSON
-                with st.expander("View Raw JSON"):
+                # Raw JSON, only sent to the browser while the toggle is on
+                if st.toggle("View Raw JSON", key=f"show_raw_{selected_id}"):
                     st.json(report)
             else:
                 st.error(f"Report {selected_id} not found.")
     else:
         st.info("No reports available. Sync data first.")
 
-with tab4:
+# Data dictionary documenting the fields in eLandings landing reports
+DATA_DICT = [
+    # Report-level fields
+    {"Section": "Report", "Field": "landing_report_id", "JSON Path": "landing_report_id", "Definition": "Unique identifier for the landing report", "Source": "Confirmed"},
+    {"Section": "Report", "Field": "type_of_landing_report", "JSON Path": "type_of_landing_report.@name", "Definition": "Report type: Groundfish (G), Salmon (S), Shellfish (C), etc.", "Source": "Confirmed"},
+    {"Section": "Report", "Field": "status", "JSON Path": "status.@desc", "Definition": "Report status: Draft, Initial Report Submitted, Final Report Submitted, etc.", "Source": "Confirmed"},
+    {"Section": "Report", "Field": "data_entry_user", "JSON Path": "@data_entry_user", "Definition": "eLandings user ID who created the report", "Source": "Confirmed"},
+    {"Section": "Report", "Field": "data_entry_submit_date", "JSON Path": "@data_entry_submit_date", "Definition": "Timestamp when report was first submitted", "Source": "Confirmed"},
+    {"Section": "Report", "Field": "last_change_user", "JSON Path": "@last_change_user", "Definition": "eLandings user ID who last modified the report", "Source": "Confirmed"},
+    {"Section": "Report", "Field": "last_change_date", "JSON Path": "@last_change_date", "Definition": "Timestamp of last modification", "Source": "Confirmed"},
+    {"Section": "Report", "Field": "no_change_after_date", "JSON Path": "@no_change_after_date", "Definition": "Date after which report cannot be modified (locked)", "Source": "Inferred"},
+
+    # Header fields
+    {"Section": "Header", "Field": "vessel", "JSON Path": "header.vessel.@name", "Definition": "Vessel name; #text contains ADF&G vessel number", "Source": "Confirmed"},
+    {"Section": "Header", "Field": "crew_size", "JSON Path": "header.crew_size", "Definition": "Number of crew members on the vessel", "Source": "Confirmed"},
+    {"Section": "Header", "Field": "observers_onboard", "JSON Path": "header.observers_onboard", "Definition": "Number of fisheries observers aboard", "Source": "Confirmed"},
+    {"Section": "Header", "Field": "port_of_landing", "JSON Path": "header.port_of_landing.@name", "Definition": "Port where fish was landed; @ifq_port_code is NMFS port code", "Source": "Confirmed"},
+    {"Section": "Header", "Field": "gear", "JSON Path": "header.gear.@name", "Definition": "Fishing gear type (e.g., Longline, Trawl, Pot)", "Source": "Confirmed"},
+    {"Section": "Header", "Field": "date_fishing_began", "JSON Path": "header.date_fishing_began", "Definition": "Date when fishing trip started", "Source": "Confirmed"},
+    {"Section": "Header", "Field": "days_fished", "JSON Path": "header.days_fished", "Definition": "Number of days actively fishing", "Source": "Confirmed"},
+    {"Section": "Header", "Field": "date_of_landing", "JSON Path": "header.date_of_landing", "Definition": "Date and time fish was delivered/landed", "Source": "Confirmed"},
+    {"Section": "Header", "Field": "partial_delivery", "JSON Path": "header.partial_delivery", "Definition": "True if this is a partial delivery (more to come)", "Source": "Inferred"},
+    {"Section": "Header", "Field": "last_delivery_for_trip", "JSON Path": "header.last_delivery_for_trip", "Definition": "True if this is the final delivery for the trip", "Source": "Inferred"},
+    {"Section": "Header", "Field": "multiple_ifq_permits", "JSON Path": "header.multiple_ifq_permits", "Definition": "True if catch involves multiple IFQ permits", "Source": "Inferred"},
+
+    # Processor fields
+    {"Section": "Processor", "Field": "proc_code", "JSON Path": "header.proc_code_owner.proc_code", "Definition": "ADF&G processor code; @processor attribute has processor name", "Source": "Confirmed"},
+    {"Section": "Processor", "Field": "federal_processor_number", "JSON Path": "header.federal_processor_number", "Definition": "NMFS federal processor permit number", "Source": "Confirmed"},
+    {"Section": "Processor", "Field": "registered_buyer_number", "JSON Path": "header.registered_buyer_number", "Definition": "NMFS registered buyer permit number (for IFQ fish)", "Source": "Confirmed"},
+    {"Section": "Processor", "Field": "buying_station_name", "JSON Path": "header.buying_station_name", "Definition": "Name of buying station if applicable", "Source": "Confirmed"},
+
+    # Permit worksheet
+    {"Section": "Permits", "Field": "cfec_permit", "JSON Path": "header.permit_worksheet.cfec_permit", "Definition": "CFEC (Commercial Fisheries Entry Commission) permit info", "Source": "Confirmed"},
+    {"Section": "Permits", "Field": "cfec_permit.fishery", "JSON Path": "header.permit_worksheet.cfec_permit.fishery", "Definition": "CFEC fishery code (e.g., B06B = Prince William Sound halibut)", "Source": "Confirmed"},
+    {"Section": "Permits", "Field": "cfec_permit.permit_number", "JSON Path": "header.permit_worksheet.cfec_permit.permit_number", "Definition": "CFEC permit number", "Source": "Confirmed"},
+    {"Section": "Permits", "Field": "cfec_permit.@holder", "JSON Path": "header.permit_worksheet.cfec_permit.@holder", "Definition": "Name of CFEC permit holder", "Source": "Confirmed"},
+    {"Section": "Permits", "Field": "fish_ticket_number", "JSON Path": "header.permit_worksheet.fish_ticket_number", "Definition": "State of Alaska fish ticket number (e.g., E17 203114)", "Source": "Confirmed"},
+    {"Section": "Permits", "Field": "management_program", "JSON Path": "header.permit_worksheet.management_program.program", "Definition": "Management program: IFQ, CDQ, Open Access, etc.", "Source": "Confirmed"},
+    {"Section": "Permits", "Field": "ifq_permit_number", "JSON Path": "header.permit_worksheet.ifq_permit_worksheet.ifq_permit_number", "Definition": "NMFS IFQ (Individual Fishing Quota) permit number", "Source": "Confirmed"},
+    {"Section": "Permits", "Field": "nmfs_person_id", "JSON Path": "header.permit_worksheet.ifq_permit_worksheet.nmfs_person_id", "Definition": "NMFS person ID for IFQ holder", "Source": "Confirmed"},
+
+    # Stat area
+    {"Section": "Stat Area", "Field": "stat_area", "JSON Path": "header.stat_area_worksheet.stat_area", "Definition": "ADF&G statistical area code (6-digit)", "Source": "Confirmed"},
+    {"Section": "Stat Area", "Field": "fed_area", "JSON Path": "header.stat_area_worksheet.stat_area.@fed_area", "Definition": "Federal reporting area code", "Source": "Confirmed"},
+    {"Section": "Stat Area", "Field": "iphc_area", "JSON Path": "header.stat_area_worksheet.stat_area.@iphc_area", "Definition": "IPHC (International Pacific Halibut Commission) regulatory area", "Source": "Confirmed"},
+    {"Section": "Stat Area", "Field": "coar_area", "JSON Path": "header.stat_area_worksheet.stat_area.@coar_area", "Definition": "COAR (Catch-in-Areas) reporting area", "Source": "Inferred"},
+    {"Section": "Stat Area", "Field": "percent", "JSON Path": "header.stat_area_worksheet.percent", "Definition": "Percentage of catch from this stat area", "Source": "Confirmed"},
+
+    # Line items (catch)
+    {"Section": "Line Items", "Field": "item_number", "JSON Path": "line_item.item_number", "Definition": "Line item sequence number", "Source": "Confirmed"},
+    {"Section": "Line Items", "Field": "species", "JSON Path": "line_item.species.@name", "Definition": "Species name; #text is ADF&G species code", "Source": "Confirmed"},
+    {"Section": "Line Items", "Field": "condition_code", "JSON Path": "line_item.condition_code.@name", "Definition": "Fish condition: Whole (1), Gutted (4), H+G (5), etc.", "Source": "Confirmed"},
+    {"Section": "Line Items", "Field": "weight", "JSON Path": "line_item.weight", "Definition": "Weight in pounds (may include ice/slime)", "Source": "Confirmed"},
+    {"Section": "Line Items", "Field": "weight_modifier", "JSON Path": "line_item.weight_modifier.@description", "Definition": "Weight adjustment type: With Ice/Slime (I/S), etc.", "Source": "Confirmed"},
+    {"Section": "Line Items", "Field": "disposition_code", "JSON Path": "line_item.disposition_code.@name", "Definition": "Disposition: Sold (60), Personal Use (43), Discarded, etc.", "Source": "Confirmed"},
+
+    # IFQ Report
+    {"Section": "IFQ Report", "Field": "net_ifq_weight", "JSON Path": "ifq_report.@net_ifq_weight", "Definition": "Net weight after ice/slime deduction for IFQ debit", "Source": "Confirmed"},
+    {"Section": "IFQ Report", "Field": "tran_number", "JSON Path": "ifq_report.@tran_number", "Definition": "NMFS RAM transaction number for IFQ debit", "Source": "Confirmed"},
+    {"Section": "IFQ Report", "Field": "tran_date_time", "JSON Path": "ifq_report.@tran_date_time", "Definition": "Timestamp of IFQ transaction", "Source": "Confirmed"},
+    {"Section": "IFQ Report", "Field": "permit_holder", "JSON Path": "ifq_report.@permit_holder", "Definition": "Name of IFQ permit holder", "Source": "Confirmed"},
+    {"Section": "IFQ Report", "Field": "card_holder", "JSON Path": "ifq_report.@card_holder", "Definition": "Name of IFQ card holder (may differ from permit holder)", "Source": "Inferred"},
+    {"Section": "IFQ Report", "Field": "return_code", "JSON Path": "ifq_report.@return_code", "Definition": "NMFS RAM system return code", "Source": "Inferred"},
+    {"Section": "IFQ Report", "Field": "return_msg", "JSON Path": "ifq_report.@return_msg", "Definition": "NMFS RAM system return message", "Source": "Inferred"},
+    {"Section": "IFQ Report", "Field": "iphc_regulatory_area", "JSON Path": "ifq_report.ifq_item.iphc_regulatory_area", "Definition": "IPHC area for IFQ accounting (2C, 3A, 3B, 4A, etc.)", "Source": "Confirmed"},
+    {"Section": "IFQ Report", "Field": "ifq_fishery", "JSON Path": "ifq_report.ifq_item.@ifq_fishery", "Definition": "IFQ fishery designation", "Source": "Confirmed"},
+    {"Section": "IFQ Report", "Field": "ice_and_slime", "JSON Path": "ifq_report.ifq_item.ice_and_slime", "Definition": "True if ice/slime deduction was applied", "Source": "Confirmed"},
+    {"Section": "IFQ Report", "Field": "sold_weight", "JSON Path": "ifq_report.ifq_item.sold_weight", "Definition": "Sold weight before ice/slime deduction", "Source": "Inferred"},
+    {"Section": "IFQ Report", "Field": "price", "JSON Path": "ifq_report.ifq_item.price", "Definition": "Price per pound (often 0 in test data)", "Source": "Confirmed"},
+]
+
+
+@st.cache_data
+def data_dictionary_frame() -> tuple[pd.DataFrame, list[str]]:
+    """Build the data dictionary DataFrame and its section filter options."""
+    df = pd.DataFrame(DATA_DICT)
+    sections = ["All"] + sorted(df["Section"].unique().tolist())
+    return df, sections
+
+
+if active_tab == "Data Dictionary":
     st.header("Data Dictionary")
 
     st.markdown("""
@@ -574,81 +762,9 @@ with tab4:
     Official definitions should be verified with ADF&G/eLandings documentation.*
     """)
 
-    # Data dictionary as a dataframe
-    data_dict = [
-        # Report-level fields
-        {"Section": "Report", "Field": "landing_report_id", "JSON Path": "landing_report_id", "Definition": "Unique identifier for the landing report", "Source": "Confirmed"},
-        {"Section": "Report", "Field": "type_of_landing_report", "JSON Path": "type_of_landing_report.@name", "Definition": "Report type: Groundfish (G), Salmon (S), Shellfish (C), etc.", "Source": "Confirmed"},
-        {"Section": "Report", "Field": "status", "JSON Path": "status.@desc", "Definition": "Report status: Draft, Initial Report Submitted, Final Report Submitted, etc.", "Source": "Confirmed"},
-        {"Section": "Report", "Field": "data_entry_user", "JSON Path": "@data_entry_user", "Definition": "eLandings user ID who created the report", "Source": "Confirmed"},
-        {"Section": "Report", "Field": "data_entry_submit_date", "JSON Path": "@data_entry_submit_date", "Definition": "Timestamp when report was first submitted", "Source": "Confirmed"},
-        {"Section": "Report", "Field": "last_change_user", "JSON Path": "@last_change_user", "Definition": "eLandings user ID who last modified the report", "Source": "Confirmed"},
-        {"Section": "Report", "Field": "last_change_date", "JSON Path": "@last_change_date", "Definition": "Timestamp of last modification", "Source": "Confirmed"},
-        {"Section": "Report", "Field": "no_change_after_date", "JSON Path": "@no_change_after_date", "Definition": "Date after which report cannot be modified (locked)", "Source": "Inferred"},
-
-        # Header fields
-        {"Section": "Header", "Field": "vessel", "JSON Path": "header.vessel.@name", "Definition": "Vessel name; #text contains ADF&G vessel number", "Source": "Confirmed"},
-        {"Section": "Header", "Field": "crew_size", "JSON Path": "header.crew_size", "Definition": "Number of crew members on the vessel", "Source": "Confirmed"},
-        {"Section": "Header", "Field": "observers_onboard", "JSON Path": "header.observers_onboard", "Definition": "Number of fisheries observers aboard", "Source": "Confirmed"},
-        {"Section": "Header", "Field": "port_of_landing", "JSON Path": "header.port_of_landing.@name", "Definition": "Port where fish was landed; @ifq_port_code is NMFS port code", "Source": "Confirmed"},
-        {"Section": "Header", "Field": "gear", "JSON Path": "header.gear.@name", "Definition": "Fishing gear type (e.g., Longline, Trawl, Pot)", "Source": "Confirmed"},
-        {"Section": "Header", "Field": "date_fishing_began", "JSON Path": "header.date_fishing_began", "Definition": "Date when fishing trip started", "Source": "Confirmed"},
-        {"Section": "Header", "Field": "days_fished", "JSON Path": "header.days_fished", "Definition": "Number of days actively fishing", "Source": "Confirmed"},
-        {"Section": "Header", "Field": "date_of_landing", "JSON Path": "header.date_of_landing", "Definition": "Date and time fish was delivered/landed", "Source": "Confirmed"},
-        {"Section": "Header", "Field": "partial_delivery", "JSON Path": "header.partial_delivery", "Definition": "True if this is a partial delivery (more to come)", "Source": "Inferred"},
-        {"Section": "Header", "Field": "last_delivery_for_trip", "JSON Path": "header.last_delivery_for_trip", "Definition": "True if this is the final delivery for the trip", "Source": "Inferred"},
-        {"Section": "Header", "Field": "multiple_ifq_permits", "JSON Path": "header.multiple_ifq_permits", "Definition": "True if catch involves multiple IFQ permits", "Source": "Inferred"},
-
-        # Processor fields
-        {"Section": "Processor", "Field": "proc_code", "JSON Path": "header.proc_code_owner.proc_code", "Definition": "ADF&G processor code; @processor attribute has processor name", "Source": "Confirmed"},
-        {"Section": "Processor", "Field": "federal_processor_number", "JSON Path": "header.federal_processor_number", "Definition": "NMFS federal processor permit number", "Source": "Confirmed"},
-        {"Section": "Processor", "Field": "registered_buyer_number", "JSON Path": "header.registered_buyer_number", "Definition": "NMFS registered buyer permit number (for IFQ fish)", "Source": "Confirmed"},
-        {"Section": "Processor", "Field": "buying_station_name", "JSON Path": "header.buying_station_name", "Definition": "Name of buying station if applicable", "Source": "Confirmed"},
-
-        # Permit worksheet
-        {"Section": "Permits", "Field": "cfec_permit", "JSON Path": "header.permit_worksheet.cfec_permit", "Definition": "CFEC (Commercial Fisheries Entry Commission) permit info", "Source": "Confirmed"},
-        {"Section": "Permits", "Field": "cfec_permit.fishery", "JSON Path": "header.permit_worksheet.cfec_permit.fishery", "Definition": "CFEC fishery code (e.g., B06B = Prince William Sound halibut)", "Source": "Confirmed"},
-        {"Section": "Permits", "Field": "cfec_permit.permit_number", "JSON Path": "header.permit_worksheet.cfec_permit.permit_number", "Definition": "CFEC permit number", "Source": "Confirmed"},
-        {"Section": "Permits", "Field": "cfec_permit.@holder", "JSON Path": "header.permit_worksheet.cfec_permit.@holder", "Definition": "Name of CFEC permit holder", "Source": "Confirmed"},
-        {"Section": "Permits", "Field": "fish_ticket_number", "JSON Path": "header.permit_worksheet.fish_ticket_number", "Definition": "State of Alaska fish ticket number (e.g., E17 203114)", "Source": "Confirmed"},
-        {"Section": "Permits", "Field": "management_program", "JSON Path": "header.permit_worksheet.management_program.program", "Definition": "Management program: IFQ, CDQ, Open Access, etc.", "Source": "Confirmed"},
-        {"Section": "Permits", "Field": "ifq_permit_number", "JSON Path": "header.permit_worksheet.ifq_permit_worksheet.ifq_permit_number", "Definition": "NMFS IFQ (Individual Fishing Quota) permit number", "Source": "Confirmed"},
-        {"Section": "Permits", "Field": "nmfs_person_id", "JSON Path": "header.permit_worksheet.ifq_permit_worksheet.nmfs_person_id", "Definition": "NMFS person ID for IFQ holder", "Source": "Confirmed"},
-
-        # Stat area
-        {"Section": "Stat Area", "Field": "stat_area", "JSON Path": "header.stat_area_worksheet.stat_area", "Definition": "ADF&G statistical area code (6-digit)", "Source": "Confirmed"},
-        {"Section": "Stat Area", "Field": "fed_area", "JSON Path": "header.stat_area_worksheet.stat_area.@fed_area", "Definition": "Federal reporting area code", "Source": "Confirmed"},
-        {"Section": "Stat Area", "Field": "iphc_area", "JSON Path": "header.stat_area_worksheet.stat_area.@iphc_area", "Definition": "IPHC (International Pacific Halibut Commission) regulatory area", "Source": "Confirmed"},
-        {"Section": "Stat Area", "Field": "coar_area", "JSON Path": "header.stat_area_worksheet.stat_area.@coar_area", "Definition": "COAR (Catch-in-Areas) reporting area", "Source": "Inferred"},
-        {"Section": "Stat Area", "Field": "percent", "JSON Path": "header.stat_area_worksheet.percent", "Definition": "Percentage of catch from this stat area", "Source": "Confirmed"},
-
-        # Line items (catch)
-        {"Section": "Line Items", "Field": "item_number", "JSON Path": "line_item.item_number", "Definition": "Line item sequence number", "Source": "Confirmed"},
-        {"Section": "Line Items", "Field": "species", "JSON Path": "line_item.species.@name", "Definition": "Species name; #text is ADF&G species code", "Source": "Confirmed"},
-        {"Section": "Line Items", "Field": "condition_code", "JSON Path": "line_item.condition_code.@name", "Definition": "Fish condition: Whole (1), Gutted (4), H+G (5), etc.", "Source": "Confirmed"},
-        {"Section": "Line Items", "Field": "weight", "JSON Path": "line_item.weight", "Definition": "Weight in pounds (may include ice/slime)", "Source": "Confirmed"},
-        {"Section": "Line Items", "Field": "weight_modifier", "JSON Path": "line_item.weight_modifier.@description", "Definition": "Weight adjustment type: With Ice/Slime (I/S), etc.", "Source": "Confirmed"},
-        {"Section": "Line Items", "Field": "disposition_code", "JSON Path": "line_item.disposition_code.@name", "Definition": "Disposition: Sold (60), Personal Use (43), Discarded, etc.", "Source": "Confirmed"},
-
-        # IFQ Report
-        {"Section": "IFQ Report", "Field": "net_ifq_weight", "JSON Path": "ifq_report.@net_ifq_weight", "Definition": "Net weight after ice/slime deduction for IFQ debit", "Source": "Confirmed"},
-        {"Section": "IFQ Report", "Field": "tran_number", "JSON Path": "ifq_report.@tran_number", "Definition": "NMFS RAM transaction number for IFQ debit", "Source": "Confirmed"},
-        {"Section": "IFQ Report", "Field": "tran_date_time", "JSON Path": "ifq_report.@tran_date_time", "Definition": "Timestamp of IFQ transaction", "Source": "Confirmed"},
-        {"Section": "IFQ Report", "Field": "permit_holder", "JSON Path": "ifq_report.@permit_holder", "Definition": "Name of IFQ permit holder", "Source": "Confirmed"},
-        {"Section": "IFQ Report", "Field": "card_holder", "JSON Path": "ifq_report.@card_holder", "Definition": "Name of IFQ card holder (may differ from permit holder)", "Source": "Inferred"},
-        {"Section": "IFQ Report", "Field": "return_code", "JSON Path": "ifq_report.@return_code", "Definition": "NMFS RAM system return code", "Source": "Inferred"},
-        {"Section": "IFQ Report", "Field": "return_msg", "JSON Path": "ifq_report.@return_msg", "Definition": "NMFS RAM system return message", "Source": "Inferred"},
-        {"Section": "IFQ Report", "Field": "iphc_regulatory_area", "JSON Path": "ifq_report.ifq_item.iphc_regulatory_area", "Definition": "IPHC area for IFQ accounting (2C, 3A, 3B, 4A, etc.)", "Source": "Confirmed"},
-        {"Section": "IFQ Report", "Field": "ifq_fishery", "JSON Path": "ifq_report.ifq_item.@ifq_fishery", "Definition": "IFQ fishery designation", "Source": "Confirmed"},
-        {"Section": "IFQ Report", "Field": "ice_and_slime", "JSON Path": "ifq_report.ifq_item.ice_and_slime", "Definition": "True if ice/slime deduction was applied", "Source": "Confirmed"},
-        {"Section": "IFQ Report", "Field": "sold_weight", "JSON Path": "ifq_report.ifq_item.sold_weight", "Definition": "Sold weight before ice/slime deduction", "Source": "Inferred"},
-        {"Section": "IFQ Report", "Field": "price", "JSON Path": "ifq_report.ifq_item.price", "Definition": "Price per pound (often 0 in test data)", "Source": "Confirmed"},
-    ]
-
-    df_dict = pd.DataFrame(data_dict)
+    df_dict, sections = data_dictionary_frame()
 
     # Filter by section
-    sections = ["All"] + sorted(df_dict["Section"].unique().tolist())
     selected_section = st.selectbox("Filter by Section", sections)
 
     if selected_section != "All":
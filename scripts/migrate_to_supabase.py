@@ -11,12 +11,21 @@ Usage:
 Environment variables required:
     SUPABASE_URL - Your Supabase project URL
     SUPABASE_KEY - Your Supabase anon/service key
+
+For large imports, --copy loads everything over a direct Postgres connection
+with COPY instead of REST upserts. It needs psycopg, the content_hash column
+(see the upgrade step in supabase_schema.sql) and:
+    DATABASE_URL - Postgres connection string for the Supabase database
 """
 
-import json
 import os
 import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
+
+import orjson
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "client"))
@@ -27,13 +36,45 @@ load_dotenv()
 
 from supabase_storage import SupabaseStorage
 
+# Threads reading and decoding report files ahead of the uploads
+LOAD_WORKERS = min(4, os.cpu_count() or 1)
+
+# Batches decoded ahead of the upload in progress
+READ_AHEAD_BATCHES = 2
+
+
+def load_report(file_path: Path) -> tuple[Optional[dict], str]:
+    """Read and decode one report file, returning (report, error message)."""
+    try:
+        return orjson.loads(file_path.read_bytes()), ""
+    except Exception as e:
+        return None, str(e)
+
+
+def load_reports_ahead(pool: ThreadPoolExecutor, files: list[Path], window: int):
+    """Yield load_report results for files in order, decoding ahead in the pool.
+
+    At most window files are read ahead of the consumer, so memory stays
+    bounded when uploads are slower than decoding.
+    """
+    ahead = deque()
+    for file_path in files:
+        if len(ahead) >= window:
+            yield ahead.popleft().result()
+        ahead.append(pool.submit(load_report, file_path))
+    while ahead:
+        yield ahead.popleft().result()
 
-def migrate_reports(data_dir: str = "data/landing_reports", batch_size: int = 50):
+
+def migrate_reports(data_dir: str = "data/landing_reports", batch_size: int = 50, use_copy: bool = False):
     """Migrate all JSON reports to Supabase.
 
     Args:
         data_dir: Directory containing landing_report_*.json files
-        batch_size: Number of reports to process before showing progress
+        batch_size: Number of reports saved per request, and files processed
+            between progress updates
+        use_copy: Load all reports in one COPY over a direct Postgres
+            connection instead of batched REST upserts
     """
     # Initialize Supabase
     url = os.getenv("SUPABASE_URL")
@@ -66,35 +107,68 @@ def migrate_reports(data_dir: str = "data/landing_reports", batch_size: int = 50
     existing_ids = storage.get_existing_report_ids()
     print(f"Already in Supabase: {len(existing_ids)} reports")
 
-    # Migrate each file
+    # Migrate files in batches of batch_size reports
     migrated = 0
     skipped = 0
     errors = []
-
-    for i, file_path in enumerate(json_files, 1):
-        report_id = file_path.stem.replace("landing_report_", "")
-
-        # Skip if already exists
-        if report_id in existing_ids:
-            skipped += 1
-            continue
+    batch = []  # (report_id, report) pairs waiting to be saved
+
+    def flush():
+        nonlocal migrated
+        if storage.save_reports_bulk([report for _, report in batch]):
+            migrated += len(batch)
+        else:
+            # Retry one by one so a bad report doesn't fail the whole batch
+            for batch_id, report in batch:
+                if storage.save_report(report, skip_unchanged=False):
+                    migrated += 1
+                else:
+                    errors.append({"id": batch_id, "error": "save_report returned False"})
+        batch.clear()
+
+    pending = [f for f in json_files if f.stem.replace("landing_report_", "") not in existing_ids]
+    if use_copy:
+        skipped = total - len(pending)
+        print(f"Loading {len(pending)} reports with COPY...")
+
+        def decoded_reports():
+            with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as pool:
+                loaded = load_reports_ahead(pool, pending, READ_AHEAD_BATCHES * batch_size)
+                for file_path, (report, error) in zip(pending, loaded):
+                    if error:
+                        errors.append({"id": file_path.stem.replace("landing_report_", ""), "error": error})
+                    else:
+                        yield report
 
         try:
-            with open(file_path, encoding="utf-8", errors="replace") as f:
-                report = json.load(f)
-
-            success = storage.save_report(report)
-            if success:
-                migrated += 1
-            else:
-                errors.append({"id": report_id, "error": "save_report returned False"})
-
+            migrated = storage.bulk_load(decoded_reports())
         except Exception as e:
-            errors.append({"id": report_id, "error": str(e)})
-
-        # Progress update
-        if i % batch_size == 0 or i == total:
-            print(f"Progress: {i}/{total} - Migrated: {migrated}, Skipped: {skipped}, Errors: {len(errors)}")
+            print(f"ERROR: COPY load failed, nothing was written: {e}")
+            sys.exit(1)
+    else:
+        # Read and decode files in the background while batches upload
+        with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as pool:
+            loaded = load_reports_ahead(pool, pending, READ_AHEAD_BATCHES * batch_size)
+
+            for i, file_path in enumerate(json_files, 1):
+                report_id = file_path.stem.replace("landing_report_", "")
+
+                # Skip if already exists
+                if report_id in existing_ids:
+                    skipped += 1
+                else:
+                    report, error = next(loaded)
+                    if error:
+                        errors.append({"id": report_id, "error": error})
+                    else:
+                        batch.append((report_id, report))
+
+                if len(batch) >= batch_size or i == total:
+                    flush()
+
+                # Progress update
+                if i % batch_size == 0 or i == total:
+                    print(f"Progress: {i}/{total} - Migrated: {migrated}, Skipped: {skipped}, Errors: {len(errors)}")
 
     # Final summary
     print("\n" + "=" * 60)
@@ -132,8 +206,13 @@ if __name__ == "__main__":
         "--batch-size",
         type=int,
         default=50,
-        help="Progress update frequency (default: 50)"
+        help="Reports per upload batch and progress update frequency (default: 50)"
+    )
+    parser.add_argument(
+        "--copy",
+        action="store_true",
+        help="Load with Postgres COPY over DATABASE_URL instead of REST upserts (needs psycopg)"
     )
 
     args = parser.parse_args()
-    migrate_reports(data_dir=args.data_dir, batch_size=args.batch_size)
+    migrate_reports(data_dir=args.data_dir, batch_size=args.batch_size, use_copy=args.copy)
@@ -7,7 +7,9 @@ A simple client for the eLandings ReportManagementService SOAP API.
 import os
 import html
 import requests
-import xml.etree.ElementTree as ET
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Optional
 from dotenv import load_dotenv
 
@@ -23,6 +25,21 @@ USER = os.getenv("ELANDINGS_USER")
 PWD = os.getenv("ELANDINGS_PASSWORD")
 SCHEMA_VERSION = os.getenv("ELANDINGS_SCHEMA_VERSION", "1.0")
 
+# Connections kept open to the eLandings host for reuse across calls
+HTTP_POOL_SIZE = 32
+
+# SOAP 1.1 request envelope; args are pre-escaped <argN> elements
+ENVELOPE_TEMPLATE = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:tns="{ns}">'
+    "<soapenv:Header/>"
+    "<soapenv:Body><tns:{op}>{args}</tns:{op}></soapenv:Body>"
+    "</soapenv:Envelope>"
+)
+
+# huge_tree lifts libxml2's depth and text size limits for large landing reports
+XML_PARSER = etree.XMLParser(huge_tree=True)
+
 
 class ELandingsClient:
     """Client for eLandings SOAP web services."""
@@ -33,7 +50,16 @@ class ELandingsClient:
         user: str = USER,
         password: str = PWD,
         schema_version: str = SCHEMA_VERSION,
+        pool_size: int = HTTP_POOL_SIZE,
     ):
+        """Create a client with its own keep-alive connection pool.
+
+        Args:
+            pool_size: Connections kept open to the endpoint. Set it to at
+                least the number of threads making calls concurrently, or
+                the extra connections are closed after each call instead
+                of being reused.
+        """
         self.endpoint = endpoint
         self.user = user
         self.password = password
@@ -46,57 +72,68 @@ class ELandingsClient:
             "Accept": "application/xml,text/xml,*/*",
             "Accept-Language": "en-US,en;q=0.9",
             "Connection": "keep-alive",
+            "Accept-Encoding": "gzip, deflate",
             "Content-Type": "text/xml; charset=utf-8",
             "SOAPAction": "",
         })
 
+        # Reuse one pool of keep-alive connections for every call, and retry
+        # transient gateway errors. The SOAP operations used here only read
+        # data, so retrying their POSTs is safe.
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
     def _build_envelope(self, operation: str, args: list[str]) -> str:
         """Build a SOAP 1.1 envelope for the given operation."""
-        args_xml = "\n      ".join(
-            f"<arg{i}>{self._escape(arg)}</arg{i}>" for i, arg in enumerate(args)
-        )
-        return f"""<?xml version="1.0" encoding="utf-8"?>
-<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
-                  xmlns:tns="{self.target_ns}">
-  <soapenv:Header/>
-  <soapenv:Body>
-    <tns:{operation}>
-      {args_xml}
-    </tns:{operation}>
-  </soapenv:Body>
-</soapenv:Envelope>"""
-
-    def _escape(self, value: str) -> str:
-        """Escape XML special characters."""
-        if value is None:
-            return ""
-        return html.escape(str(value))
-
-    def _call(self, operation: str, args: list[str]) -> str:
-        """Make a SOAP call and return the raw response body."""
+        args_xml = "".join([
+            f"<arg{i}>{html.escape(str(arg)) if arg is not None else ''}</arg{i}>"
+            for i, arg in enumerate(args)
+        ])
+        return ENVELOPE_TEMPLATE.format(ns=self.target_ns, op=operation, args=args_xml)
+
+    def _post(self, operation: str, args: list[str], stream: bool = False) -> requests.Response:
+        """POST a SOAP envelope for the operation and check the HTTP status."""
         envelope = self._build_envelope(operation, args)
-        resp = self.session.post(self.endpoint, data=envelope.encode("utf-8"), timeout=60)
+        resp = self.session.post(self.endpoint, data=envelope.encode("utf-8"), timeout=60, stream=stream)
         resp.raise_for_status()
-        return resp.text
-
-    def _parse_response(self, xml_text: str, response_element: str) -> Optional[str]:
-        """Parse SOAP response and extract the return value (often HTML-escaped XML)."""
-        root = ET.fromstring(xml_text)
-
-        # Find the response element (e.g., getUserInfoResponse)
-        for elem in root.iter():
-            if elem.tag.endswith(response_element):
-                # Find the <return> element inside
-                for child in elem:
-                    if child.tag == "return" or child.tag.endswith("}return"):
-                        # The return value is often HTML-escaped XML
-                        return html.unescape(child.text or "")
+        return resp
+
+    def _parse_stream(self, source, response_element: str) -> Optional[str]:
+        """Incrementally parse a SOAP response and extract the return value.
+
+        Parsing stops at the first <return> element (in any namespace) inside
+        the response element, so the rest of the document is never built.
+        """
+        for _, elem in etree.iterparse(source, events=("end",), tag="{*}return", huge_tree=True):
+            parent = elem.getparent()
+            if parent is not None and etree.QName(parent).localname == response_element:
+                # The return value is often HTML-escaped XML
+                return html.unescape(elem.text or "")
+            # Not the one we want; free it and anything parsed before it
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
         return None
 
     def _call_and_parse(self, operation: str, args: list[str]) -> Optional[str]:
-        """Call operation and parse the response."""
-        raw = self._call(operation, args)
-        return self._parse_response(raw, f"{operation}Response")
+        """Call operation and parse the response as it is received."""
+        resp = self._post(operation, args, stream=True)
+        try:
+            resp.raw.decode_content = True  # Let urllib3 undo any gzip encoding
+            return self._parse_stream(resp.raw, f"{operation}Response")
+        finally:
+            # Discard the rest of the body in raw chunks so the connection
+            # returns to the pool; read() would decompress and buffer it all
+            resp.raw.drain_conn()
+            resp.raw.release_conn()
 
     # ==================== API Methods ====================
 
@@ -238,10 +275,10 @@ class ELandingsClient:
 def pretty_print_xml(xml_string: str) -> str:
     """Pretty print XML string."""
     try:
-        root = ET.fromstring(xml_string)
-        ET.indent(root)
-        return ET.tostring(root, encoding="unicode")
-    except ET.ParseError:
+        root = etree.fromstring(xml_string.encode("utf-8"), parser=XML_PARSER)
+        etree.indent(root)
+        return etree.tostring(root, encoding="unicode")
+    except etree.XMLSyntaxError:
         return xml_string
 
 
@@ -1,6 +1,11 @@
 import os
+import re
+import socket
+import threading
 import requests
-import xml.etree.ElementTree as ET
+from concurrent.futures import Future
+from functools import lru_cache
+from lxml import etree
 from urllib.parse import urlparse, urlunparse
 from dotenv import load_dotenv
 
@@ -55,7 +60,7 @@ print("WSDL first 120 chars:", wsdl_text[:120].replace("\n", "\\n"))
 # 2) Parse WSDL + extract info
 # ============================
 try:
-    root = ET.fromstring(wsdl_text)
+    root = etree.fromstring(wsdl_resp.content, parser=etree.XMLParser(huge_tree=True))
 except Exception as e:
     raise RuntimeError(f"WSDL XML parse failed: {repr(e)} (saved wsdl_debug.xml)")
 
@@ -64,10 +69,7 @@ if not target_ns:
     raise RuntimeError("Could not find targetNamespace on WSDL root")
 print("targetNamespace:", target_ns)
 
-soap_addresses = []
-for el in root.iter():
-    if el.tag.endswith("address") and "location" in el.attrib:
-        soap_addresses.append(el.attrib["location"])
+soap_addresses = [str(loc) for loc in root.xpath("//*[local-name() = 'address']/@location")]
 
 print("\nsoap:address locations found:")
 for loc in soap_addresses:
@@ -80,6 +82,21 @@ for loc in soap_addresses:
 # ============================
 candidates = []
 
+def _tcp_reachable(host: str, port: int, timeout: float = 2) -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+# Only seed candidates for the schemes whose port accepts connections. If
+# neither does (e.g. outbound traffic must go through a proxy), try both.
+http_ok = _tcp_reachable(PUBLIC_HOST, 80)
+https_ok = _tcp_reachable(PUBLIC_HOST, 443)
+if not (http_ok or https_ok):
+    http_ok = https_ok = True
+print(f"\nReachable: http={http_ok} https={https_ok}")
+
 base_http = f"http://{PUBLIC_HOST}"
 base_https = f"https://{PUBLIC_HOST}"
 
@@ -92,17 +109,25 @@ preferred_paths = [
 ]
 
 for p in preferred_paths:
-    candidates.append(base_http + p)
-    candidates.append(base_https + p)
+    if http_ok:
+        candidates.append(base_http + p)
+    if https_ok:
+        candidates.append(base_https + p)
+
+# Each soap:address is swapped once per reachable scheme; cache the parse so
+# it is tokenized only once
+_cached_urlparse = lru_cache(maxsize=256)(urlparse)
 
 # Also try "swap host" versions of any WSDL soap:address, but keep their paths
 def swap_host_keep_path(url: str, host: str, scheme: str) -> str:
-    p = urlparse(url)
+    p = _cached_urlparse(url)
     return urlunparse(p._replace(scheme=scheme, netloc=host))
 
 for loc in soap_addresses:
-    candidates.append(swap_host_keep_path(loc, PUBLIC_HOST, "http"))
-    candidates.append(swap_host_keep_path(loc, PUBLIC_HOST, "https"))
+    if http_ok:
+        candidates.append(swap_host_keep_path(loc, PUBLIC_HOST, "http"))
+    if https_ok:
+        candidates.append(swap_host_keep_path(loc, PUBLIC_HOST, "https"))
 
 # Finally, less-likely root-mounted paths (put last)
 fallback_paths = [
@@ -110,12 +135,13 @@ fallback_paths = [
     "/ReportManagementService/",
 ]
 for p in fallback_paths:
-    candidates.append(base_http + p)
-    candidates.append(base_https + p)
+    if http_ok:
+        candidates.append(base_http + p)
+    if https_ok:
+        candidates.append(base_https + p)
 
 # de-dupe, preserve order
-seen = set()
-candidates = [u for u in candidates if not (u in seen or seen.add(u))]
+candidates = list(dict.fromkeys(candidates))
 
 print("\n=== Candidate SOAP endpoints to test ===")
 for u in candidates:
@@ -125,7 +151,8 @@ for u in candidates:
 # 4) SOAP envelopes (1.1 and 1.2)
 # ============================
 # Note: The XSD schema uses arg0, arg1, arg2 (not userId, password, schemaVersion)
-soap11_envelope = f"""<?xml version="1.0" encoding="utf-8"?>
+# Encoded once here; every endpoint and SOAPAction attempt posts the same bytes
+SOAP11_BYTES = f"""<?xml version="1.0" encoding="utf-8"?>
 <soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"
                   xmlns:tns="{target_ns}">
   <soapenv:Header/>
@@ -137,9 +164,9 @@ soap11_envelope = f"""<?xml version="1.0" encoding="utf-8"?>
     </tns:getUserInfo>
   </soapenv:Body>
 </soapenv:Envelope>
-"""
+""".encode("utf-8")
 
-soap12_envelope = f"""<?xml version="1.0" encoding="utf-8"?>
+SOAP12_BYTES = f"""<?xml version="1.0" encoding="utf-8"?>
 <soapenv:Envelope xmlns:soapenv="http://www.w3.org/2003/05/soap-envelope"
                   xmlns:tns="{target_ns}">
   <soapenv:Header/>
@@ -151,9 +178,9 @@ soap12_envelope = f"""<?xml version="1.0" encoding="utf-8"?>
     </tns:getUserInfo>
   </soapenv:Body>
 </soapenv:Envelope>
-"""
+""".encode("utf-8")
 
-# Common SOAPAction variations
+# Common SOAPAction variations, most preferred first
 soap_actions = [
     "",  # some services want empty
     "getUserInfo",
@@ -162,9 +189,22 @@ soap_actions = [
     f"{target_ns}/getUserInfo",
 ]
 
-def looks_like_html(text: str) -> bool:
-    t = (text or "").lower()
-    return ("<html" in t) or ("no xml-ws context" in t) or ("temporarily unavailable" in t)
+# Request headers, built once. The attempts run concurrently, so each
+# SOAPAction gets its own dict rather than sharing one mutated per attempt.
+SOAP11_HEADERS = {
+    action: {"Content-Type": "text/xml; charset=utf-8", "SOAPAction": action}
+    for action in soap_actions
+}
+SOAP12_HEADERS = {
+    "Content-Type": 'application/soap+xml; charset=utf-8; action="getUserInfo"',
+}
+
+# Markers of an HTML error page rather than a SOAP response, matched in one pass
+_HTML_SENTINEL = re.compile(rb"<html|no xml-ws context|temporarily unavailable", re.I)
+
+def looks_like_html(content: bytes) -> bool:
+    # Error pages show their markers near the top; don't scan the whole body
+    return bool(_HTML_SENTINEL.search((content or b"")[:4096]))
 
 def save_response(filename: str, content: str):
     with open(filename, "w", encoding="utf-8") as f:
@@ -175,18 +215,48 @@ def try_endpoint(url: str) -> bool:
     print("TESTING ENDPOINT:", url)
     print("========================================")
 
-    # SOAP 1.1 attempts
-    for action in soap_actions:
-        headers = {
-            "Content-Type": "text/xml; charset=utf-8",
-            "SOAPAction": action,
-        }
-
+    # Cheap pre-probe: skip the SOAP POSTs for paths that don't exist or hosts
+    # that can't be reached. HTML isn't treated as dead here, since JAX-WS
+    # endpoints answer non-POST requests with an HTML service page.
+    try:
+        probe = session.head(url, timeout=5, allow_redirects=False)
+    except requests.ConnectionError as e:
+        print("Probe connection error:", repr(e))
+        return False
+    except requests.RequestException as e:
+        print("Probe error (trying SOAP anyway):", repr(e))
+    else:
+        print("Probe HEAD:", probe.status_code)
+        if probe.status_code == 404:
+            print("Not found — skipping SOAP attempts.")
+            return False
+
+    # SOAP 1.1 attempts, all SOAPActions sent at once. Responses are checked
+    # in soap_actions order, so the first preferred action that works wins.
+    # Each attempt runs on a daemon thread: lower-priority requests still in
+    # flight after a win can't be cancelled, and this way they don't hold up
+    # the script's exit.
+    def start_soap11(action: str) -> Future:
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(
+                    session.post(url, data=SOAP11_BYTES, headers=SOAP11_HEADERS[action], timeout=60)
+                )
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+    futures = [(action, start_soap11(action)) for action in soap_actions]
+    for action, future in futures:
         print("\n--- SOAP 1.1 ATTEMPT ---")
         print("SOAPAction:", repr(action))
 
         try:
-            resp = session.post(url, data=soap11_envelope.encode("utf-8"), headers=headers, timeout=60)
+            resp = future.result()
         except Exception as e:
             print("Request error:", repr(e))
             continue
@@ -198,18 +268,14 @@ def try_endpoint(url: str) -> bool:
 
         save_response("soap_response_debug.xml", resp.text or "")
 
-        if resp.status_code in (200, 500) and not looks_like_html(resp.text or ""):
+        if resp.status_code in (200, 500) and not looks_like_html(resp.content):
             print("\n✅ Non-HTML response (SOAP or SOAP Fault) — stopping.")
             return True
 
     # SOAP 1.2 attempt
     print("\n--- SOAP 1.2 ATTEMPT ---")
-    headers12 = {
-        "Content-Type": 'application/soap+xml; charset=utf-8; action="getUserInfo"',
-    }
-
     try:
-        resp12 = session.post(url, data=soap12_envelope.encode("utf-8"), headers=headers12, timeout=60)
+        resp12 = session.post(url, data=SOAP12_BYTES, headers=SOAP12_HEADERS, timeout=60)
     except Exception as e:
         print("Request error:", repr(e))
         return False
@@ -221,7 +287,7 @@ def try_endpoint(url: str) -> bool:
 
     save_response("soap_response_debug.xml", resp12.text or "")
 
-    if resp12.status_code in (200, 500) and not looks_like_html(resp12.text or ""):
+    if resp12.status_code in (200, 500) and not looks_like_html(resp12.content):
         print("\n✅ Non-HTML response (SOAP or SOAP Fault) — stopping.")
         return True
 
@@ -0,0 +1,190 @@
+"""
+Landing Report Index
+
+Index of locally stored landing reports (one row per file with every display
+column), persisted as a parquet sidecar next to the JSON files. The Streamlit
+app reads it instead of re-parsing every report, and the sync writes rows for
+the reports it saves so they never need a second parse.
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+import msgspec
+import pandas as pd
+
+# Sidecar file caching the local report index, stored in the reports directory
+INDEX_FILENAME = ".index.parquet"
+
+
+# Narrow views of a landing report holding only the fields the index needs.
+# msgspec skips every other JSON node while decoding instead of building it.
+# They hold no reference cycles, so gc=False keeps large line item arrays out
+# of the garbage collector's tracking.
+class CodedValue(msgspec.Struct, gc=False):
+    """Element with a code in #text and a display name in @name."""
+    code: str = msgspec.field(name="#text", default="")
+    name: str = msgspec.field(name="@name", default="")
+
+
+class StatusValue(msgspec.Struct, gc=False):
+    desc: str = msgspec.field(name="@desc", default="")
+
+
+class IndexLineItem(msgspec.Struct, gc=False):
+    species: CodedValue | str | None = None
+    weight: Any = None
+
+
+class IndexHeader(msgspec.Struct, gc=False):
+    vessel: CodedValue | str | None = None
+    port_of_landing: CodedValue | str | None = None
+    date_of_landing: Any = ""
+
+
+class IndexReport(msgspec.Struct, gc=False):
+    landing_report_id: Any = ""
+    status: StatusValue | str | None = None
+    type_of_landing_report: CodedValue | str | None = None
+    header: IndexHeader = msgspec.field(default_factory=IndexHeader)
+    line_item: list[IndexLineItem] | IndexLineItem = msgspec.field(default_factory=list)
+    last_change_date: str = msgspec.field(name="@last_change_date", default="")
+
+
+decode_index_report = msgspec.json.Decoder(IndexReport).decode
+
+# Index columns, in the order they are stored in the sidecar
+INDEX_COLUMNS = [
+    "file", "mtime", "Report ID", "Status", "Type", "Vessel", "ADF&G Vessel #",
+    "Port", "Landing Date", "Species", "Total Weight (lbs)", "Last Modified",
+]
+
+
+def _extract_value(obj: Any, default: str = "") -> str:
+    """Extract text value from dict or return string directly."""
+    # Plain strings are the common case, so check for them first
+    if type(obj) is str:
+        return obj or default
+    if isinstance(obj, dict):
+        if "#text" in obj:
+            return obj["#text"]
+        return obj["@name"] if "@name" in obj else str(obj)
+    return str(obj) if obj else default
+
+
+def _name(obj: Any) -> str:
+    """Display name of a coded value, or "" for a missing or scalar one."""
+    return obj.name if isinstance(obj, CodedValue) else ""
+
+
+def _weight(value: Any) -> float:
+    """Weight of a line item in pounds, or 0 if missing or malformed."""
+    try:
+        return float(value or 0)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def build_index_frame(files: list[str], mtimes: list[int], reports: list[IndexReport]) -> pd.DataFrame:
+    """Build index rows for parsed reports column by column.
+
+    ``files`` are file names relative to the reports directory.
+    """
+    if not reports:
+        return pd.DataFrame()
+
+    # The vessel #text value is the ADF&G vessel number
+    vessels = [r.header.vessel for r in reports]
+    vessels = [v if isinstance(v, CodedValue) else CodedValue() for v in vessels]
+
+    # Flatten line items into one long frame, then aggregate per report
+    item_rows, item_species, item_weights = [], [], []
+    for row, report in enumerate(reports):
+        line_items = report.line_item
+        if isinstance(line_items, IndexLineItem):
+            line_items = [line_items]
+        for item in line_items:
+            item_rows.append(row)
+            item_species.append(_name(item.species))
+            item_weights.append(_weight(item.weight))
+    items = pd.DataFrame({"row": item_rows, "species": item_species, "weight": item_weights})
+    rows = pd.RangeIndex(len(reports))
+    total_weight = items.groupby("row")["weight"].sum().reindex(rows, fill_value=0.0)
+    # Unique species per report in first-seen order
+    species = (
+        items.loc[items["species"] != "", ["row", "species"]]
+        .drop_duplicates()
+        .groupby("row", sort=False)["species"]
+        .agg(", ".join)
+        .reindex(rows, fill_value="")
+    )
+
+    # The low-cardinality columns repeat a handful of values across every
+    # report; interning shares one string object per distinct value
+    return pd.DataFrame({
+        "file": files,
+        "mtime": mtimes,
+        "Report ID": [_extract_value(r.landing_report_id) for r in reports],
+        "Status": [sys.intern(r.status.desc if isinstance(r.status, StatusValue) else "") for r in reports],
+        "Type": [sys.intern(_name(r.type_of_landing_report)) for r in reports],
+        "Vessel": [sys.intern(v.name) for v in vessels],
+        "ADF&G Vessel #": [v.code for v in vessels],
+        "Port": [sys.intern(_name(r.header.port_of_landing)) for r in reports],
+        "Landing Date": [_extract_value(r.header.date_of_landing) for r in reports],
+        "Species": species.to_numpy(),
+        "Total Weight (lbs)": total_weight.to_numpy(),
+        "Last Modified": [r.last_change_date[:10] for r in reports],
+    }, columns=INDEX_COLUMNS)
+
+
+def load_index_sidecar(index_path: Path) -> pd.DataFrame:
+    """Load the cached report index, or an empty frame if unavailable.
+
+    A sidecar written with an older set of columns counts as unavailable, so
+    the index is rebuilt from the report files.
+    """
+    if not index_path.exists():
+        return pd.DataFrame()
+    try:
+        return pd.read_parquet(index_path, columns=INDEX_COLUMNS)
+    except Exception:
+        return pd.DataFrame()
+
+
+def save_index_sidecar(df: pd.DataFrame, index_path: Path) -> None:
+    """Write the report index sidecar, replacing any previous version."""
+    tmp_path = index_path.with_suffix(".tmp")
+    try:
+        df.to_parquet(tmp_path, compression="zstd", index=False)
+        os.replace(tmp_path, index_path)
+    except Exception:
+        pass  # Cache only; the index is rebuilt from files next time
+
+
+def add_reports_to_index(data_dir: Path, saved: list[tuple[Path, dict]]) -> None:
+    """Add or replace index rows for reports that were just written to disk.
+
+    Args:
+        data_dir: Reports directory holding the sidecar
+        saved: (file path, parsed report dict) pairs for the written files
+    """
+    files, mtimes, reports = [], [], []
+    for path, report in saved:
+        try:
+            reports.append(msgspec.convert(report, IndexReport))
+        except msgspec.ValidationError:
+            continue  # Left for the app to index from the file
+        files.append(path.name)
+        mtimes.append(path.stat().st_mtime_ns)
+    if not reports:
+        return
+    new_rows = build_index_frame(files, mtimes, reports)
+
+    index_path = Path(data_dir) / INDEX_FILENAME
+    cached = load_index_sidecar(index_path)
+    if not cached.empty:
+        cached = cached[~cached["file"].isin(files)]
+    frames = [frame for frame in (cached, new_rows) if not frame.empty]
+    save_index_sidecar(pd.concat(frames, ignore_index=True), index_path)
@@ -5,12 +5,53 @@ Provides storage abstraction for landing reports using Supabase PostgreSQL.
 Supports normalized schema with 3 tables: landing_reports, landing_report_items, landing_report_stat_areas.
 """
 
+import hashlib
 import os
+import re
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
+import orjson
 from supabase import create_client, Client
 
+# Direct Postgres access for bulk loads (optional dependency)
+try:
+    import psycopg
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    PSYCOPG_AVAILABLE = False
+
+# UTC offset at the end of an eLandings date, e.g. the "-09:00" in "2017-01-02-09:00"
+_TZ_SUFFIX = re.compile(r"[+-]\d{2}:\d{2}$")
+
+# Rows requested per page when listing report IDs; matches Supabase's default
+# max rows per request
+ID_PAGE_SIZE = 1000
+
+# IDs checked per request when looking up specific reports; keeps the
+# id=in.(...) filter well within URL length limits
+ID_CHECK_CHUNK_SIZE = 200
+
+# Columns of the landing_reports, landing_report_items and
+# landing_report_stat_areas rows, in the order they are built and written
+REPORT_COLUMNS = [
+    "id", "report_type", "report_type_name", "status", "status_desc",
+    "vessel_adfg_number", "vessel_name", "port_code", "port_name",
+    "gear_code", "gear_name", "date_of_landing", "date_fishing_began",
+    "crew_size", "processor_code", "processor_name", "fish_ticket_number",
+    "data_entry_user", "data_entry_date", "last_change_user",
+    "last_change_date", "content_hash", "raw_json",
+]
+ITEM_COLUMNS = [
+    "landing_report_id", "item_number", "species_code", "species_name",
+    "weight", "condition_code", "condition_name", "disposition_code",
+    "disposition_name", "fish_ticket_number",
+]
+STAT_AREA_COLUMNS = [
+    "landing_report_id", "item_number", "stat_area", "fed_area", "iphc_area",
+    "percent",
+]
+
 
 class SupabaseStorage:
     """Storage backend using Supabase for landing reports."""
@@ -29,86 +70,148 @@ class SupabaseStorage:
             raise ValueError("Supabase URL and key are required. Set SUPABASE_URL and SUPABASE_KEY.")
 
         self.client: Client = create_client(self.url, self.key)
+        self._content_hash_supported: Optional[bool] = None  # Checked on first save
 
     def _extract_value(self, obj: Any, default: str = "") -> str:
         """Extract text value from dict or return string directly."""
         if isinstance(obj, dict):
-            return obj.get("#text", obj.get("@name", str(obj)))
+            # Only stringify the whole dict when it has neither key
+            if "#text" in obj:
+                return obj["#text"]
+            return obj["@name"] if "@name" in obj else str(obj)
         return str(obj) if obj else default
 
     def _extract_attr(self, obj: Any, attr: str, default: str = "") -> str:
         """Extract attribute value from dict."""
         if isinstance(obj, dict):
-            return obj.get(f"@{attr}", default)
+            return obj.get("@" + attr, default)
         return default
 
     def _parse_date(self, date_str: str) -> Optional[str]:
         """Parse date string to ISO format for PostgreSQL."""
-        if not date_str:
+        # Anything but a non-empty string (e.g. an element parsed as a dict)
+        # has no usable date
+        if not date_str or not isinstance(date_str, str):
             return None
         # Handle various date formats from eLandings
         # e.g., "2017-01-02-09:00", "2017-01-01", "2017-02-02T10:12:47.000-09:00"
+        date_part = date_str.partition("T")[0]
         try:
-            # Remove timezone suffix like "-09:00" from date-only strings
-            if len(date_str) == 16 and date_str[10] == '-':
-                date_str = date_str[:10]
-            # Parse ISO datetime
-            if 'T' in date_str:
-                return date_str  # Already ISO format
-            # Parse date only
-            return date_str[:10]
-        except Exception:
+            return datetime.fromisoformat(_TZ_SUFFIX.sub("", date_part)).date().isoformat()
+        except ValueError:
             return None
 
     def _parse_timestamp(self, ts_str: str) -> Optional[str]:
         """Parse timestamp string to ISO format."""
-        if not ts_str:
+        if not ts_str or not isinstance(ts_str, str):
             return None
+        # A date with an offset ("2017-01-02-09:00") is midnight at that
+        # offset; fromisoformat would read the offset as a time of day
+        if "T" not in ts_str:
+            match = _TZ_SUFFIX.search(ts_str)
+            if match:
+                ts_str = f"{ts_str[:match.start()]}T00:00:00{match.group()}"
         try:
-            return ts_str  # Supabase handles ISO timestamps
-        except Exception:
+            return datetime.fromisoformat(ts_str).isoformat()
+        except ValueError:
             return None
 
     def _flatten_report(self, report: dict) -> dict:
         """Extract flat fields from nested landing report JSON."""
-        header = report.get("header", {})
-        vessel = header.get("vessel", {})
-        port = header.get("port_of_landing", {})
-        gear = header.get("gear", {})
-        proc_code_owner = header.get("proc_code_owner", {})
-        proc_code = proc_code_owner.get("proc_code", {}) if isinstance(proc_code_owner, dict) else {}
-        permit_ws = header.get("permit_worksheet", {})
+        return self._flatten_reports([report])[0]
+
+    def _flatten_reports(self, reports: list[dict]) -> list[dict]:
+        """Extract flat fields from a batch of nested landing report JSON.
+
+        Works column by column: each field is pulled for the whole batch in
+        one comprehension, and the columns are zipped into rows at the end.
+        """
+        _v = self._extract_value
+        _a = self._extract_attr
+        _date = self._parse_date
+        _ts = self._parse_timestamp
+
+        headers = [r.get("header", {}) for r in reports]
+        report_types = [r.get("type_of_landing_report", {}) for r in reports]
+        statuses = [r.get("status", {}) for r in reports]
+        vessels = [h.get("vessel", {}) for h in headers]
+        ports = [h.get("port_of_landing", {}) for h in headers]
+        gears = [h.get("gear", {}) for h in headers]
+        proc_codes = [
+            owner.get("proc_code", {}) if isinstance(owner, dict) else {}
+            for owner in (h.get("proc_code_owner", {}) for h in headers)
+        ]
+        crew_sizes = [h.get("crew_size") for h in headers]
 
         # Handle permit_worksheet as list or dict
-        if isinstance(permit_ws, list):
-            permit_ws = permit_ws[0] if permit_ws else {}
-
-        fish_ticket = permit_ws.get("fish_ticket_number", "")
-
-        return {
-            "id": int(report.get("landing_report_id", 0)),
-            "report_type": self._extract_value(report.get("type_of_landing_report", {})),
-            "report_type_name": self._extract_attr(report.get("type_of_landing_report", {}), "name"),
-            "status": self._extract_value(report.get("status", {})),
-            "status_desc": self._extract_attr(report.get("status", {}), "desc"),
-            "vessel_adfg_number": self._extract_value(vessel),
-            "vessel_name": self._extract_attr(vessel, "name"),
-            "port_code": self._extract_value(port),
-            "port_name": self._extract_attr(port, "name"),
-            "gear_code": self._extract_value(gear),
-            "gear_name": self._extract_attr(gear, "name"),
-            "date_of_landing": self._parse_date(header.get("date_of_landing", "")),
-            "date_fishing_began": self._parse_date(header.get("date_fishing_began", "")),
-            "crew_size": int(header.get("crew_size", 0)) if header.get("crew_size") else None,
-            "processor_code": self._extract_value(proc_code),
-            "processor_name": self._extract_attr(proc_code, "processor"),
-            "fish_ticket_number": fish_ticket,
-            "data_entry_user": report.get("@data_entry_user", ""),
-            "data_entry_date": self._parse_timestamp(report.get("@data_entry_submit_date", "")),
-            "last_change_user": report.get("@last_change_user", ""),
-            "last_change_date": self._parse_timestamp(report.get("@last_change_date", "")),
-            "raw_json": report,
-        }
+        permit_wss = [h.get("permit_worksheet", {}) for h in headers]
+        permit_wss = [
+            (ws[0] if ws else {}) if isinstance(ws, list) else ws for ws in permit_wss
+        ]
+
+        columns = [
+            [int(r.get("landing_report_id", 0)) for r in reports],
+            [_v(t) for t in report_types],
+            [_a(t, "name") for t in report_types],
+            [_v(st) for st in statuses],
+            [_a(st, "desc") for st in statuses],
+            [_v(v) for v in vessels],
+            [_a(v, "name") for v in vessels],
+            [_v(p) for p in ports],
+            [_a(p, "name") for p in ports],
+            [_v(g) for g in gears],
+            [_a(g, "name") for g in gears],
+            [_date(h.get("date_of_landing", "")) for h in headers],
+            [_date(h.get("date_fishing_began", "")) for h in headers],
+            [int(c) if c else None for c in crew_sizes],
+            [_v(pc) for pc in proc_codes],
+            [_a(pc, "processor") for pc in proc_codes],
+            [ws.get("fish_ticket_number", "") for ws in permit_wss],
+            [r.get("@data_entry_user", "") for r in reports],
+            [_ts(r.get("@data_entry_submit_date", "")) for r in reports],
+            [r.get("@last_change_user", "") for r in reports],
+            [_ts(r.get("@last_change_date", "")) for r in reports],
+            [self._content_hash(r) for r in reports],
+            reports,  # raw_json
+        ]
+        return [dict(zip(REPORT_COLUMNS, row)) for row in zip(*columns)]
+
+    @staticmethod
+    def _content_hash(report: dict) -> str:
+        """Fingerprint of a report's content, used to skip unchanged saves."""
+        return hashlib.blake2b(orjson.dumps(report), digest_size=16).hexdigest()
+
+    def _has_content_hash(self) -> bool:
+        """Whether landing_reports has the content_hash column.
+
+        Databases created before the column was added keep working, just
+        without skipping unchanged reports, until the migration in
+        supabase_schema.sql is run.
+        """
+        if self._content_hash_supported is None:
+            try:
+                self.client.table("landing_reports").select("content_hash").limit(1).execute()
+                self._content_hash_supported = True
+            except Exception as e:
+                if getattr(e, "code", None) != "42703":  # undefined_column
+                    raise
+                print("landing_reports.content_hash is missing; run the upgrade step in "
+                      "supabase_schema.sql to skip unchanged reports")
+                self._content_hash_supported = False
+        return self._content_hash_supported
+
+    def _unchanged_report_ids(self, hashes: dict[int, str]) -> set[int]:
+        """IDs of reports already stored with the same content hash."""
+        report_ids = list(hashes)
+        unchanged = set()
+        for start in range(0, len(report_ids), ID_CHECK_CHUNK_SIZE):
+            result = self.client.table("landing_reports").select("id, content_hash").in_(
+                "id", report_ids[start:start + ID_CHECK_CHUNK_SIZE]
+            ).execute()
+            unchanged.update(
+                r["id"] for r in result.data or [] if r["content_hash"] == hashes.get(r["id"])
+            )
+        return unchanged
 
     def _extract_line_items(self, report: dict) -> list[dict]:
         """Extract line items from landing report."""
@@ -165,45 +268,172 @@ class SupabaseStorage:
 
         return areas
 
-    def save_report(self, report: dict) -> bool:
+    def _prepare_batch(self, reports: Iterable[dict]) -> tuple[list[dict], list[dict], list[dict]]:
+        """Flatten reports into landing_reports, item and stat area rows.
+
+        Rows are keyed by report ID, so if a report appears more than once
+        the last copy wins.
+        """
+        reports = list(reports)
+        by_id = {}
+        for flat_report, report in zip(self._flatten_reports(reports), reports):
+            by_id[flat_report["id"]] = (flat_report, report)
+        flat_reports = []
+        line_items = []
+        stat_areas = []
+        for flat_report, report in by_id.values():
+            flat_reports.append(flat_report)
+            line_items.extend(self._extract_line_items(report))
+            stat_areas.extend(self._extract_stat_areas(report))
+        return flat_reports, line_items, stat_areas
+
+    def save_report(self, report: dict, skip_unchanged: bool = True) -> bool:
         """Save a landing report to Supabase (upsert).
 
         Args:
             report: Parsed landing report dict from XML.
+            skip_unchanged: Skip the write if the stored content hash matches.
 
         Returns:
             True if successful, False otherwise.
         """
-        try:
-            report_id = int(report.get("landing_report_id", 0))
+        return self.save_reports_bulk([report], skip_unchanged=skip_unchanged)
 
-            # Flatten and upsert main report
-            flat_report = self._flatten_report(report)
-            self.client.table("landing_reports").upsert(flat_report).execute()
+    def save_reports_bulk(self, reports: list[dict], skip_unchanged: bool = True) -> bool:
+        """Save a batch of landing reports to Supabase (upsert).
+
+        Writes the whole batch with one request per table operation instead
+        of five per report. If any report appears more than once, the last
+        copy wins.
+
+        A report's content hash is only stored once all of its rows have been
+        written, so a partly failed save is never mistaken for an unchanged
+        report later.
+
+        Args:
+            reports: Parsed landing report dicts from XML.
+            skip_unchanged: Leave reports whose stored content hash matches
+                untouched. Pass False when retrying a failed save.
+
+        Returns:
+            True if successful, False otherwise.
+        """
+        if not reports:
+            return True
+        try:
+            flat_reports, line_items, stat_areas = self._prepare_batch(reports)
+            hashes = {r["id"]: r.pop("content_hash") for r in flat_reports}
+            use_hash = self._has_content_hash()
+
+            # Drop reports that haven't changed since they were last saved
+            unchanged = self._unchanged_report_ids(hashes) if skip_unchanged and use_hash else set()
+            if unchanged:
+                flat_reports = [r for r in flat_reports if r["id"] not in unchanged]
+                line_items = [r for r in line_items if r["landing_report_id"] not in unchanged]
+                stat_areas = [r for r in stat_areas if r["landing_report_id"] not in unchanged]
+                if not flat_reports:
+                    return True
+            report_ids = [flat_report["id"] for flat_report in flat_reports]
+
+            # Upsert main reports, clearing the stored hash until the child
+            # rows below have been replaced
+            if use_hash:
+                for flat_report in flat_reports:
+                    flat_report["content_hash"] = None
+            self.client.table("landing_reports").upsert(flat_reports).execute()
 
             # Delete existing child records before inserting new ones
-            self.client.table("landing_report_items").delete().eq(
-                "landing_report_id", report_id
+            self.client.table("landing_report_items").delete().in_(
+                "landing_report_id", report_ids
             ).execute()
-            self.client.table("landing_report_stat_areas").delete().eq(
-                "landing_report_id", report_id
+            self.client.table("landing_report_stat_areas").delete().in_(
+                "landing_report_id", report_ids
             ).execute()
 
-            # Insert line items
-            line_items = self._extract_line_items(report)
             if line_items:
                 self.client.table("landing_report_items").insert(line_items).execute()
-
-            # Insert stat areas
-            stat_areas = self._extract_stat_areas(report)
             if stat_areas:
                 self.client.table("landing_report_stat_areas").insert(stat_areas).execute()
 
+            # Every row is saved; record the hashes
+            if use_hash:
+                self.client.table("landing_reports").upsert(
+                    [{"id": report_id, "content_hash": hashes[report_id]} for report_id in report_ids]
+                ).execute()
+
             return True
         except Exception as e:
-            print(f"Error saving report {report.get('landing_report_id')}: {e}")
+            print(f"Error saving batch of {len(reports)} reports: {e}")
             return False
 
+    def bulk_load(self, reports: Iterable[dict], database_url: Optional[str] = None) -> int:
+        """Load reports straight into Postgres with COPY, bypassing PostgREST.
+
+        Meant for large initial loads, where it is much faster than REST
+        upserts. The rows are copied into temporary staging tables and merged
+        from there in one transaction: reports are upserted, and their items
+        and stat areas replaced, just as save_reports_bulk does.
+
+        Requires the optional psycopg package and a direct database
+        connection string.
+
+        Args:
+            reports: Parsed landing report dicts
+            database_url: Postgres connection string. Falls back to the
+                DATABASE_URL env var.
+
+        Returns:
+            Number of reports loaded
+
+        Raises:
+            ValueError: If psycopg or the connection string is missing
+            psycopg.Error: If the load fails; nothing is written in that case
+        """
+        if not PSYCOPG_AVAILABLE:
+            raise ValueError("bulk_load requires psycopg. Install it with: pip install psycopg")
+        database_url = database_url or os.getenv("DATABASE_URL")
+        if not database_url:
+            raise ValueError("Postgres connection string is required. Set DATABASE_URL.")
+
+        flat_reports, line_items, stat_areas = self._prepare_batch(reports)
+        if not flat_reports:
+            return 0
+        staged = [
+            ("landing_reports", REPORT_COLUMNS, flat_reports),
+            ("landing_report_items", ITEM_COLUMNS, line_items),
+            ("landing_report_stat_areas", STAT_AREA_COLUMNS, stat_areas),
+        ]
+
+        with psycopg.connect(database_url) as conn, conn.cursor() as cur:
+            for table, columns, rows in staged:
+                cols = ", ".join(columns)
+                cur.execute(
+                    f"CREATE TEMP TABLE _stage_{table} ON COMMIT DROP AS "
+                    f"SELECT {cols} FROM {table} WITH NO DATA"
+                )
+                with cur.copy(f"COPY _stage_{table} ({cols}) FROM STDIN") as copy:
+                    for row in rows:
+                        if table == "landing_reports":
+                            row = {**row, "raw_json": orjson.dumps(row["raw_json"]).decode()}
+                        copy.write_row([row[col] for col in columns])
+
+            report_cols = ", ".join(REPORT_COLUMNS)
+            updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in REPORT_COLUMNS[1:])
+            cur.execute(
+                f"INSERT INTO landing_reports ({report_cols}) "
+                f"SELECT {report_cols} FROM _stage_landing_reports "
+                f"ON CONFLICT (id) DO UPDATE SET {updates}"
+            )
+            for table, columns, _ in staged[1:]:
+                cols = ", ".join(columns)
+                cur.execute(
+                    f"DELETE FROM {table} WHERE landing_report_id IN "
+                    f"(SELECT id FROM _stage_landing_reports)"
+                )
+                cur.execute(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM _stage_{table}")
+
+        return len(flat_reports)
+
     def get_report(self, report_id: int) -> Optional[dict]:
         """Fetch a single report by ID.
 
@@ -264,23 +494,63 @@ class SupabaseStorage:
             print(f"Error fetching report {report_id}: {e}")
             return None
 
-    def get_existing_report_ids(self) -> set[str]:
-        """Get set of all report IDs in the database."""
+    def get_existing_report_ids(self, candidate_ids: Optional[Iterable[Any]] = None) -> set[str]:
+        """Get set of report IDs in the database.
+
+        IDs are fetched in pages, since PostgREST caps the rows returned by a
+        single request (1000 by default on Supabase).
+
+        Args:
+            candidate_ids: If given, only these IDs are looked up, so the
+                cost depends on the number of candidates rather than the
+                size of the table. IDs that aren't numeric can't exist and
+                are left out.
+        """
+        if candidate_ids is not None:
+            return self._find_report_ids(candidate_ids)
         try:
-            result = self.client.table("landing_reports").select("id").execute()
-            return {str(r["id"]) for r in (result.data or [])}
+            ids = set()
+            start = 0
+            while True:
+                result = self.client.table("landing_reports").select("id").order("id").range(
+                    start, start + ID_PAGE_SIZE - 1
+                ).execute()
+                rows = result.data or []
+                ids.update(str(r["id"]) for r in rows)
+                if len(rows) < ID_PAGE_SIZE:
+                    return ids
+                start += ID_PAGE_SIZE
         except Exception as e:
             print(f"Error fetching report IDs: {e}")
             return set()
 
+    def _find_report_ids(self, candidate_ids: Iterable[Any]) -> set[str]:
+        """Get the subset of candidate_ids that exist in the database."""
+        numeric_ids = list(dict.fromkeys(int(i) for i in map(str, candidate_ids) if i.isdigit()))
+        try:
+            ids = set()
+            for start in range(0, len(numeric_ids), ID_CHECK_CHUNK_SIZE):
+                result = self.client.table("landing_reports").select("id").in_(
+                    "id", numeric_ids[start:start + ID_CHECK_CHUNK_SIZE]
+                ).execute()
+                ids.update(str(r["id"]) for r in result.data or [])
+            return ids
+        except Exception as e:
+            print(f"Error looking up report IDs: {e}")
+            return set()
+
     def get_sync_state(self) -> dict:
-        """Get sync state from database."""
+        """Get sync state from database.
+
+        Only last_sync is stored; synced_reports is always empty, since the
+        reports themselves are the record of what was synced.
+        """
         try:
             result = self.client.table("sync_state").select("*").eq("id", 1).execute()
             if result.data:
                 return {
                     "last_sync": result.data[0].get("last_sync"),
-                    "synced_reports": list(self.get_existing_report_ids()),
+                    "synced_reports": [],
                 }
             return {"last_sync": None, "synced_reports": []}
         except Exception:
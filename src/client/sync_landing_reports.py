@@ -5,80 +5,119 @@ Pulls landing reports from eLandings and saves them locally or to Supabase.
 Supports incremental sync based on last modified date.
 """
 
+import io
 import json
 import os
-import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Optional
 
-from elandings_client import ELandingsClient
+import orjson
+from lxml import etree
 
+from elandings_client import HTTP_POOL_SIZE, ELandingsClient
+from report_index import add_reports_to_index
 
-def xml_to_dict(element: ET.Element) -> dict[str, Any]:
-    """Convert XML element to dictionary, preserving attributes."""
-    result: dict[str, Any] = {}
+# Default number of concurrent getLandingReport calls made during a sync
+FETCH_WORKERS = 16
+
+# Reports written to Supabase per bulk save during a sync
+SAVE_BATCH_SIZE = 50
+
+# Comments and processing instructions are dropped, as with the stdlib parser
+REPORT_PARSER = etree.XMLParser(huge_tree=True, remove_comments=True, remove_pis=True)
 
+
+def xml_to_dict(element: etree._Element) -> dict[str, Any]:
+    """Convert XML element to dictionary, preserving attributes."""
     # Add attributes with @ prefix
-    for key, value in element.attrib.items():
-        result[f"@{key}"] = value
+    result: dict[str, Any] = {"@" + key: value for key, value in element.attrib.items()}
 
     # Process child elements
-    children = list(element)
-    if children:
-        child_dict: dict[str, Any] = {}
-        for child in children:
-            child_data = xml_to_dict(child)
+    if len(element):
+        for child in element:
             tag = child.tag
+            child_data = xml_to_dict(child)
 
             # Handle multiple elements with same tag
-            if tag in child_dict:
-                if not isinstance(child_dict[tag], list):
-                    child_dict[tag] = [child_dict[tag]]
-                child_dict[tag].append(child_data)
+            existing = result.get(tag)
+            if existing is None:
+                result[tag] = child_data
+            elif type(existing) is list:
+                existing.append(child_data)
             else:
-                child_dict[tag] = child_data
+                result[tag] = [existing, child_data]
+        return result
 
-        result.update(child_dict)
-    elif element.text and element.text.strip():
-        # Element has text content
-        if result:  # Has attributes
-            result["#text"] = element.text.strip()
-        else:
-            return element.text.strip()  # type: ignore
+    text = element.text
+    if text:
+        text = text.strip()
+        if text:
+            # Element has text content
+            if not result:  # No attributes
+                return text  # type: ignore
+            result["#text"] = text
 
     return result
 
 
 def parse_landing_report_summary(xml_str: str) -> list[dict[str, Any]]:
-    """Parse landing report search results into list of report summaries."""
-    root = ET.fromstring(xml_str)
-    reports = []
+    """Parse landing report search results into list of report summaries.
 
-    for summary in root.findall(".//landing_report_summary"):
-        report = xml_to_dict(summary)
-        reports.append(report)
+    The results are parsed incrementally: each summary is converted as soon as
+    it has been read and then freed, so the full document is never held in
+    memory next to its converted copy.
+    """
+    reports = []
+    events = etree.iterparse(
+        io.BytesIO(xml_str.encode("utf-8")),
+        events=("end",),
+        tag="landing_report_summary",
+        huge_tree=True,
+        remove_comments=True,
+        remove_pis=True,
+    )
+    for _, summary in events:
+        reports.append(xml_to_dict(summary))
+        # Free the summary and the already converted siblings before it
+        summary.clear()
+        parent = summary.getparent()
+        if parent is not None:
+            while summary.getprevious() is not None:
+                del parent[0]
 
     return reports
 
 
 def parse_landing_report(xml_str: str) -> dict[str, Any]:
     """Parse a full landing report XML into dictionary."""
-    root = ET.fromstring(xml_str)
+    root = etree.fromstring(xml_str.encode("utf-8"), REPORT_PARSER)
     return xml_to_dict(root)
 
 
 class LandingReportSync:
     """Syncs landing reports from eLandings to local storage or Supabase."""
 
-    def __init__(self, output_dir: str = "data/landing_reports", supabase_storage=None):
+    def __init__(
+        self,
+        output_dir: str = "data/landing_reports",
+        supabase_storage=None,
+        client: Optional[ELandingsClient] = None,
+        pretty: bool = False,
+    ):
         """Initialize sync client.
 
         Args:
             output_dir: Directory for local file storage (used when supabase_storage is None)
             supabase_storage: Optional SupabaseStorage instance for cloud storage
+            client: Optional ELandingsClient to reuse; defaults to one using
+                    credentials from the environment
+            pretty: Indent saved report JSON for reading by hand; reports are
+                    written compact by default
         """
-        self.client = ELandingsClient()
+        self.client = client or ELandingsClient()
+        self.dump_options = orjson.OPT_INDENT_2 if pretty else 0
         self.supabase = supabase_storage
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -89,8 +128,7 @@ class LandingReportSync:
         if self.supabase:
             return self.supabase.get_sync_state()
         if self.state_file.exists():
-            with open(self.state_file, encoding="utf-8") as f:
-                return json.load(f)
+            return orjson.loads(self.state_file.read_bytes())
         return {"last_sync": None, "synced_reports": []}
 
     def _save_state(self, state: dict[str, Any]) -> None:
@@ -98,8 +136,7 @@ class LandingReportSync:
         if self.supabase:
             self.supabase.save_sync_state(state.get("last_sync", ""))
         else:
-            with open(self.state_file, "w", encoding="utf-8") as f:
-                json.dump(state, f, indent=2, default=str, ensure_ascii=False)
+            self.state_file.write_bytes(orjson.dumps(state, default=str, option=orjson.OPT_INDENT_2))
 
     def _save_report(self, report: dict[str, Any]) -> Optional[Path]:
         """Save a landing report to JSON file or Supabase.
@@ -116,19 +153,68 @@ class LandingReportSync:
             return None
         else:
             filename = self.output_dir / f"landing_report_{report_id}.json"
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(report, f, indent=2, default=str, ensure_ascii=False)
+            data = memoryview(orjson.dumps(report, default=str, option=self.dump_options))
+            fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
             return filename
 
-    def _get_existing_report_ids(self) -> set[str]:
-        """Get set of report IDs already saved (locally or in Supabase)."""
+    def _local_report_ids(self) -> set[str]:
+        """IDs of the locally saved reports, from the report file names.
+
+        One scandir pass over the directory; only names are matched, no file
+        is opened or stat'ed.
+        """
+        prefix, suffix = "landing_report_", ".json"
+        with os.scandir(self.output_dir) as entries:
+            return {
+                e.name[len(prefix):-len(suffix)]
+                for e in entries
+                if e.name.startswith(prefix) and e.name.endswith(suffix)
+            }
+
+    def _save_supabase_batch(self, batch: list[tuple[str, dict[str, Any]]]) -> list[tuple[str, bool]]:
+        """Save (report_id, report) pairs to Supabase with one bulk write.
+
+        If the bulk write fails, the reports are saved one by one so a bad
+        report only fails itself.
+
+        Returns:
+            (report_id, saved) pairs
+        """
+        if self.supabase.save_reports_bulk([report for _, report in batch]):
+            return [(report_id, True) for report_id, _ in batch]
+        return [
+            (report_id, self.supabase.save_report(report, skip_unchanged=False))
+            for report_id, report in batch
+        ]
+
+    @staticmethod
+    def _unwrap_id(report_id: Any) -> Any:
+        """Report ID from a summary, unwrapping the #text of an element with attributes."""
+        if isinstance(report_id, dict):
+            return report_id.get("#text", "")
+        return report_id
+
+    def _fetch_report(self, report_id: str) -> Optional[dict[str, Any]]:
+        """Fetch and parse one landing report, or None for an empty response."""
+        report_xml = self.client.get_landing_report(str(report_id))
+        if not report_xml:
+            return None
+        return parse_landing_report(report_xml)
+
+    def _get_existing_report_ids(self, candidate_ids: list[Any]) -> set[str]:
+        """Get the set of report IDs already saved (locally or in Supabase).
+
+        Supabase is only asked about candidate_ids, the reports found by
+        this sync; the local IDs are small enough to read in full.
+        """
         if self.supabase:
-            return self.supabase.get_existing_report_ids()
-        existing = set()
-        for f in self.output_dir.glob("landing_report_*.json"):
-            report_id = f.stem.replace("landing_report_", "")
-            existing.add(report_id)
-        return existing
+            return self.supabase.get_existing_report_ids(candidate_ids)
+        return self._local_report_ids()
 
     def sync(
         self,
@@ -137,6 +223,7 @@ class LandingReportSync:
         full_refresh: bool = False,
         skip_existing: bool = True,
         progress_callback=None,
+        max_workers: int = FETCH_WORKERS,
     ) -> dict[str, Any]:
         """
         Sync landing reports from eLandings.
@@ -147,7 +234,13 @@ class LandingReportSync:
             operation_id: Filter to specific operation (optional)
             full_refresh: If True, ignores last sync date and pulls all reports
             skip_existing: If True, skip reports already saved locally
-            progress_callback: Optional callback(current, total, report_id) for progress updates
+            progress_callback: Optional callback(current, total, report_id, action) for
+                   progress updates, where action is "skipped" or "fetched". Skipped
+                   reports are reported with a single call before any fetch. It is
+                   always called from the calling thread.
+            max_workers: Number of reports fetched concurrently. Going above the
+                   client's pool size (HTTP_POOL_SIZE by default) means some
+                   fetches open a fresh connection each time.
 
         Returns:
             Summary of sync results
@@ -183,47 +276,69 @@ class LandingReportSync:
         summaries = parse_landing_report_summary(reports_xml)
         print(f"Found {len(summaries)} reports to sync")
 
-        # Get existing reports to skip
-        existing_ids = self._get_existing_report_ids() if skip_existing else set()
+        # Normalize the IDs once, then get the ones already saved to skip
+        report_ids = [self._unwrap_id(summary.get("landing_report_id", {})) for summary in summaries]
+        existing_ids = self._get_existing_report_ids(report_ids) if skip_existing else set()
 
         # Step 2: Fetch full details for each report
         synced = []
-        skipped = []
         errors = []
+        saved_files = []  # (path, report) pairs for the local index
+        pending = []  # (report_id, report) pairs waiting for a Supabase bulk save
 
-        for i, summary in enumerate(summaries, 1):
-            report_id = summary.get("landing_report_id", {})
-            if isinstance(report_id, dict):
-                report_id = report_id.get("#text", "")
-
-            # Skip if already exists locally
-            if skip_existing and str(report_id) in existing_ids:
-                skipped.append(report_id)
-                print(f"  [{i}/{len(summaries)}] Skipping report {report_id} (already exists)")
-                if progress_callback:
-                    progress_callback(i, len(summaries), report_id, "skipped")
-                continue
-
-            print(f"  [{i}/{len(summaries)}] Fetching report {report_id}...", end=" ")
-            if progress_callback:
-                progress_callback(i, len(summaries), report_id, "fetching")
-
-            try:
-                report_xml = self.client.get_landing_report(str(report_id))
-                if report_xml:
-                    report = parse_landing_report(report_xml)
-                    filepath = self._save_report(report)
-                    synced.append({
-                        "report_id": report_id,
-                        "file": str(filepath),
-                    })
-                    print("OK")
+        def flush_pending():
+            for report_id, saved in self._save_supabase_batch(pending):
+                if saved:
+                    synced.append({"report_id": report_id, "file": str(None)})
                 else:
-                    errors.append({"report_id": report_id, "error": "Empty response"})
-                    print("EMPTY")
-            except Exception as e:
-                errors.append({"report_id": report_id, "error": str(e)})
-                print(f"ERROR: {e}")
+                    errors.append({"report_id": report_id, "error": "Supabase save failed"})
+            pending.clear()
+
+        # Split off the reports already saved
+        to_fetch = [report_id for report_id in report_ids if str(report_id) not in existing_ids]
+        skipped = [report_id for report_id in report_ids if str(report_id) in existing_ids]
+        if skipped:
+            print(f"  Skipping {len(skipped)} reports (already exist)")
+            if progress_callback:
+                progress_callback(len(skipped), len(summaries), skipped[-1], "skipped")
+
+        # Fetch and parse concurrently; the calls are network-bound. Results are
+        # saved and reported here on the calling thread as they complete.
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(self._fetch_report, report_id): report_id for report_id in to_fetch}
+            for i, future in enumerate(as_completed(futures), len(skipped) + 1):
+                report_id = futures[future]
+                print(f"  [{i}/{len(summaries)}] Report {report_id}...", end=" ")
+                if progress_callback:
+                    progress_callback(i, len(summaries), report_id, "fetched")
+
+                try:
+                    report = future.result()
+                    if report is not None and self.supabase:
+                        pending.append((report_id, report))
+                        if len(pending) >= SAVE_BATCH_SIZE:
+                            flush_pending()
+                        print("OK")
+                    elif report is not None:
+                        filepath = self._save_report(report)
+                        saved_files.append((filepath, report))
+                        synced.append({
+                            "report_id": report_id,
+                            "file": str(filepath),
+                        })
+                        print("OK")
+                    else:
+                        errors.append({"report_id": report_id, "error": "Empty response"})
+                        print("EMPTY")
+                except Exception as e:
+                    errors.append({"report_id": report_id, "error": str(e)})
+                    print(f"ERROR: {e}")
+
+        if pending:
+            flush_pending()
+
+        # Index the new files from the parsed reports instead of re-reading them
+        add_reports_to_index(self.output_dir, saved_files)
 
         # Update state
         state["last_sync"] = sync_start.strftime("%Y-%m-%dT%H:%M:%S")
@@ -256,14 +371,19 @@ if __name__ == "__main__":
     parser.add_argument("--operation", default="", help="Filter by operation ID")
     parser.add_argument("--full", action="store_true", help="Full refresh (ignore last sync)")
     parser.add_argument("--output", default="data/landing_reports", help="Output directory")
+    parser.add_argument("--workers", type=int, default=FETCH_WORKERS, help="Concurrent report fetches")
+    parser.add_argument("--pretty", action="store_true", help="Indent saved report JSON for debugging")
 
     args = parser.parse_args()
 
-    sync = LandingReportSync(output_dir=args.output)
+    # Keep one pooled connection per fetch worker
+    client = ELandingsClient(pool_size=max(HTTP_POOL_SIZE, args.workers))
+    sync = LandingReportSync(output_dir=args.output, client=client, pretty=args.pretty)
     result = sync.sync(
         since=args.since,
         operation_id=args.operation,
         full_refresh=args.full,
+        max_workers=args.workers,
     )
 
     print("\n" + "=" * 60)
@@ -1,5 +1,9 @@
 -- eLandings Sync - Supabase Schema
 -- Run this SQL in your Supabase SQL Editor to create the required tables.
+--
+-- UPGRADING an existing database: run only the statement in the "Upgrade"
+-- section at the end of this file. Until it is run, saves still work but
+-- unchanged reports are rewritten, and migrate_to_supabase.py --copy fails.
 
 -- Table 1: Main landing reports
 CREATE TABLE landing_reports (
@@ -24,6 +28,7 @@ CREATE TABLE landing_reports (
   data_entry_date TIMESTAMPTZ,                      -- when data was entered
   last_change_user TEXT,                            -- user who last modified
   last_change_date TIMESTAMPTZ,                     -- last modification timestamp
+  content_hash TEXT,                                -- hash of raw_json; unchanged reports aren't rewritten
   raw_json JSONB,                                   -- full original report for reference
   created_at TIMESTAMPTZ DEFAULT NOW(),             -- when synced to Supabase
   updated_at TIMESTAMPTZ DEFAULT NOW()              -- when last updated in Supabase
@@ -90,3 +95,7 @@ CREATE INDEX idx_stat_areas_iphc ON landing_report_stat_areas(iphc_area);
 -- Create policies as needed for your authentication setup
 -- Example: Allow authenticated users to read all data
 -- CREATE POLICY "Allow authenticated read" ON landing_reports FOR SELECT TO authenticated USING (true);
+
+-- Upgrade (required for databases created before content_hash was added).
+-- Safe to run more than once.
+ALTER TABLE landing_reports ADD COLUMN IF NOT EXISTS content_hash TEXT;